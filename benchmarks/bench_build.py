@@ -0,0 +1,59 @@
+"""
+    Build time of the state machine of item_engine parsers, on generated keyword lexers
+
+    python benchmarks/bench_build.py [keywords] [baseline]
+
+    a lexer of n keywords has about 2n states (the prefixes of the keywords), the registry of the states is a dict,
+    the list registry it replaces looked up each state of each transition in the list of all the states, it is only
+    measured up to ``baseline`` keywords as it becomes quadratic (minutes for 10k keywords)
+"""
+import random
+import sys
+import time
+from item_engine.textbase import *
+
+
+class ListParser(Parser):
+    """Parser with the list registry, each lookup scans all the branch sets"""
+
+    def include(self, group_select):
+        included = []
+        for branch_set in group_select.targets:
+            if not branch_set.is_terminal and branch_set not in self.branch_sets:
+                self.branch_sets.append(branch_set)
+                included.append(branch_set)
+        return included
+
+    def get_nt_state(self, branch_set):
+        return self.branch_sets.index(branch_set)
+
+
+def make_keywords(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    keywords = set()
+    while len(keywords) < count:
+        keywords.add("".join(rng.choice("abcdefghij") for _ in range(rng.randint(3, 8))))
+    return sorted(keywords)
+
+
+def measure(cls, keywords):
+    lexer, _, _ = MakeLexer(branches={f"KW_{index}": string(keyword) for index, keyword in enumerate(keywords)})
+    start = time.perf_counter()
+    parser = cls(name="keywords", branch_set=lexer, input_cls=Char, output_cls=Token, skips=[],
+                 reflexive=False, formal_inputs=False, formal_outputs=False)
+    parser.data()
+    return len(parser.branch_sets), time.perf_counter() - start
+
+
+def main(keywords: int = 10000, baseline: int = 2000):
+    for count in (keywords // 8, keywords // 4, keywords // 2, keywords):
+        states, fast = measure(Parser, make_keywords(count))
+        line = f"{count:>7} keywords {states:>7} states | dict {fast:8.3f} s"
+        if count <= baseline:
+            _, slow = measure(ListParser, make_keywords(count))
+            line += f" | list {slow:8.3f} s | x{slow / fast:.1f}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
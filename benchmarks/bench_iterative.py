@@ -0,0 +1,39 @@
+"""
+    Recursive and iterative parsers on flat and deeply nested texts
+
+    python benchmarks/bench_iterative.py [items] [depth]
+
+    each level of parentheses costs 20 to 30 python frames to the recursive parser,
+    it can only read a few dozen levels with the default recursion limit
+"""
+import sys
+import time
+from text_engine import *
+from engines import make_engine
+
+
+def measure(engine: Engine, text: str):
+    start = time.perf_counter()
+    try:
+        engine.read(text, "Sum")
+    except RecursionError:
+        return "RecursionError"
+    return f"{time.perf_counter() - start:8.3f} s"
+
+
+def main(items: int = 5000, depth: int = 2000):
+    texts = {
+        "flat": " + ".join(["(1 * 22 + 333)"] * items),
+        "nested 30": " + ".join(["(" * 30 + "1" + ")" * 30] * (items // 30)),
+        f"nested {depth}": "(" * depth + "1" + ")" * depth,
+    }
+
+    for name, text in texts.items():
+        for packrat in (False, True):
+            recursive = measure(make_engine(packrat=packrat, fast=True), text)
+            iterative = measure(make_engine(packrat=packrat, fast=True, iterative=True), text)
+            print(f"{name:<12} packrat={packrat!s:<5} recursive {recursive:>14} | iterative {iterative:>14}")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
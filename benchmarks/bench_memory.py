@@ -0,0 +1,49 @@
+"""
+    Memory used by the tokens and the results of a parse
+
+    python benchmarks/bench_memory.py [tokens]
+"""
+import sys
+import tracemalloc
+from engines import make_engine
+
+
+def make_text(tokens: int):
+    return " + ".join(["(1 * 22 + 333)"] * (tokens // 8))
+
+
+def measure(function, *args):
+    tracemalloc.start()
+    value = function(*args)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, current, peak
+
+
+def main(tokens: int = 100_000):
+    engine = make_engine()
+    text = make_text(tokens)
+
+    tokens, current, peak = measure(engine.lexer.tokenize, text)
+    print(f"tokens  : {len(tokens):>9} objects {current / 2 ** 20:8.2f} MiB kept {peak / 2 ** 20:8.2f} MiB peak "
+          f"{current / len(tokens):6.0f} B/token")
+
+    result, current, peak = measure(engine.parser.apply, engine.parser.builders[0], tokens, 0)
+    assert result and result.to_position == len(tokens)
+
+    count = 0
+    stack = [result]
+    while stack:
+        item = stack.pop()
+        count += 1
+        if hasattr(item, "results"):
+            stack.extend(item.results)
+        elif hasattr(item, "result") and item.result is not None:
+            stack.append(item.result)
+
+    print(f"results : {count:>9} objects {current / 2 ** 20:8.2f} MiB kept {peak / 2 ** 20:8.2f} MiB peak "
+          f"{current / count:6.0f} B/result")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
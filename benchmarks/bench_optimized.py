@@ -0,0 +1,67 @@
+"""
+    Build time of item_engine lexers on large unicode charsets
+
+    python benchmarks/bench_optimized.py [chars ...]
+
+    ``optimized`` used to compute the ItemSet[V] of each explicit item of a state from all its ItemSet[K],
+    and to merge the items one by one, it now computes it once per part of the items listed by the same ItemSet[K],
+    the lexers are built with both in the same run (the previous ``optimized`` is item_engine._reference)
+"""
+import sys
+import time
+from contextlib import contextmanager
+import item_engine.build
+from item_engine._reference import reference_optimized
+from item_engine.textbase import *
+
+
+def make_lexer(size: int):
+    """A lexer whose names, numbers and symbols are the first ``size`` printable characters"""
+    chars = [char for char in map(chr, range(0x20, 0x30000)) if char.isprintable()][:size]
+    letters = "".join(char for char in chars if char.isalpha())
+    numbers = "".join(char for char in chars if char.isdigit())
+    symbols = "".join(char for char in chars if not char.isalnum() and not char.isspace())
+
+    lexer, _, _ = MakeLexer(
+        keywords=["if", "else", "for", "while", "λ", "αβγ"],
+        symbols=[" + ", " - ", " ∀ ", " ∈ ", " ≤ ", " ≥ "],
+        branches=dict(
+            WHITESPACE=charset(" \t").inc().repeat(1, INF),
+            NAME=charset(letters).inc() & charset(letters + numbers).inc().repeat(0, INF),
+            NUMBER=charset(numbers).inc().repeat(1, INF),
+            SYMBOL=charset(symbols).inc(),
+        ),
+    )
+    return lexer
+
+
+@contextmanager
+def reference():
+    """Build the states with the previous ``optimized``"""
+    optimized = item_engine.build.optimized
+    item_engine.build.optimized = reference_optimized
+    try:
+        yield
+    finally:
+        item_engine.build.optimized = optimized
+
+
+def measure(size: int):
+    lexer = make_lexer(size)
+    start = time.perf_counter()
+    parser = Parser(name="unicode", branch_set=lexer, input_cls=Char, output_cls=Token, skips=[],
+                    reflexive=False, formal_inputs=False, formal_outputs=False)
+    parser.data()
+    return time.perf_counter() - start
+
+
+def main(*sizes: int):
+    for size in sizes or (500, 1000, 2000, 4000):
+        seconds = measure(size)
+        with reference():
+            previous = measure(size)
+        print(f"{size:>7} chars | {seconds:8.3f} s | previous {previous:8.3f} s | x{previous / seconds:.1f}")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,68 @@
+"""
+    Lexers with and without the shortcuts of their first character table, on whitespace heavy texts
+
+    python benchmarks/bench_whitespace.py [lines]
+
+    the ignored runs of whitespace are skipped inline and the single character symbols are made into tokens
+    directly, the other characters go through the patterns (and their regexes) as before
+"""
+import random
+import sys
+import time
+from text_engine import *
+from text_engine.utils.base import PATTERN_LIBS
+
+
+class PlainLexer(Lexer):
+    """Lexer without shortcuts, every character goes through its patterns"""
+
+    @staticmethod
+    def build_shortcuts(patterns):
+        return {}, {}
+
+
+def make_lexer(cls, compiled: bool):
+    lexer = cls(compiled=compiled)
+    for name in ("maths", "blocs", "units", "ponctuation"):
+        for pattern_config in PATTERN_LIBS[name]:
+            lexer.add_pattern(**pattern_config)
+    lexer.add_pattern("WHITESPACE", mode="re", expr="[ \t\n]+", ignore=True, priority=300)
+    lexer.add_pattern("ERROR", mode="re", expr=".+", flag=16, priority=300)
+    return lexer
+
+
+def make_texts(lines: int):
+    rng = random.Random(0)
+    words = ["x", "value_2", "42", "3.14", "+", "*", "(", ")", "=", ",", "'s'"]
+
+    def line(spaces):
+        return "".join(rng.choice(words) + " " * rng.randint(1, spaces) for _ in range(8))
+
+    return {
+        "dense": "\n".join("".join(rng.choice(words) for _ in range(8)) for _ in range(lines)),
+        "spaced": "\n".join(line(1) for _ in range(lines)),
+        "indented": "\n".join(" " * 4 * rng.randint(0, 6) + line(4) for _ in range(lines)),
+        "aligned": "\n".join(" " * 40 + line(16) + " " * 20 for _ in range(lines)),
+    }
+
+
+def measure(lexer: Lexer, text: str):
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        lexer.tokenize(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(lines: int = 5000):
+    for name, text in make_texts(lines).items():
+        for compiled in (False, True):
+            plain = measure(make_lexer(PlainLexer, compiled), text)
+            fast = measure(make_lexer(Lexer, compiled), text)
+            print(f"{name:<10} compiled={compiled!s:<5} {len(text):>8} chars | "
+                  f"patterns {plain:7.3f} s | shortcuts {fast:7.3f} s | x{plain / fast:.2f}")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
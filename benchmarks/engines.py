@@ -0,0 +1,25 @@
+"""
+    Engines shared by the benchmarks, imported from their scripts (``benchmarks`` is the first entry of their path)
+"""
+from text_engine import *
+
+
+def make_engine(**config):
+    """Sums and products of integers and parentheses, ``config`` is given to the Engine (packrat, fast, iterative ...)"""
+    lexer = Lexer()
+    lexer.add_pattern("INT", mode="re", expr="[0-9]+", value=int)
+    lexer.add_pattern("PLUS", mode="str", expr="+")
+    lexer.add_pattern("STAR", mode="str", expr="*")
+    lexer.add_pattern("LP", mode="str", expr="(")
+    lexer.add_pattern("RP", mode="str", expr=")")
+    lexer.add_pattern("WHITESPACE", mode="re", expr="[ \t\n]+", ignore=True)
+
+    parser = Parser()
+    parser.add_builder("Sum", match("Term in *").sep_by("PLUS"))
+    parser.add_routine("Term", match("Mul") | match("Atom"))
+    parser.add_builder("Mul", match("Atom in *").sep_by("STAR"))
+    parser.add_builder("Par", match("Sum in *").wrapped_by("LP", "RP"))
+    parser.add_builder("Int", match("INT as value"))
+    parser.add_routine("Atom", match("Par") | match("Int"))
+
+    return Engine(lexer, parser, **config)
@@ -0,0 +1,204 @@
+"""
+    Benchmark suite of the engines of the repository, on synthetic inputs of controlled size
+
+    python benchmarks/suite.py [--only NAME ...] [--sizes SIZE ...] [--repeat N] [--seed SEED] [--output FILE]
+
+    for each benchmark and each input size (in characters), the best time of ``repeat`` runs gives the chars/s and
+    tokens/s, the peak memory is measured on a separate run (tracemalloc slows the runs down),
+    the ``exponent`` of a benchmark is the least squares slope of log(time) over log(size) on all its inputs
+    (1 for a linear engine), the results are written as JSON to compare them between commits,
+    the benchmarks whose dependencies are missing are skipped, the run exits with 1 if a benchmark failed
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+FORMAT_VERSION = 1
+
+
+def make_text(size: int, seed: int, make_item, sep: str):
+    """Items of ``make_item`` joined by ``sep`` until the text reaches ``size`` characters"""
+    rng = random.Random(seed)
+    items = []
+    length = 0
+    while length < size:
+        item = make_item(rng)
+        items.append(item)
+        length += len(item) + len(sep)
+    return sep.join(items)
+
+
+def make_maths_expr(rng: random.Random, depth: int = 0):
+    terms = []
+    for _ in range(rng.randint(1, 3)):
+        choice = rng.random()
+        if depth < 2 and choice < 0.2:
+            terms.append("(" + make_maths_expr(rng, depth + 1) + ")")
+        elif choice < 0.5:
+            terms.append(rng.choice("xyzab") + rng.choice(["", "²", "^2"]))
+        elif choice < 0.65:
+            terms.append(f"{rng.randint(0, 99)}.{rng.randint(0, 99)}")
+        else:
+            terms.append(str(rng.randint(0, 999)))
+    return "".join(term + rng.choice([" + ", " - ", " * ", " / "]) for term in terms[:-1]) + terms[-1]
+
+
+def make_equation(rng: random.Random):
+    if rng.random() < 0.2:
+        args = ", ".join(make_maths_expr(rng, 1) for _ in range(rng.randint(1, 3)))
+        return f"{rng.choice('xyz')} = {rng.choice('fgh')}({args})"
+    return f"{rng.choice('xyz')} = {make_maths_expr(rng)}"
+
+
+def make_item_engine_expr(rng: random.Random):
+    expr = make_maths_expr(rng, 2).replace("²", "^2")
+    return "".join(char for char in expr if char != ".")
+
+
+def text_engine_example_3():
+    """The equations grammar of examples/example_3.py, read backward with packrat parsing"""
+    from examples.example_3 import engine
+    engine.parser.packrat = True
+
+    def run(text):
+        assert engine.read(text, backward=True) is not None
+
+    def count_tokens(text):
+        return len(engine.lexer.tokenize(text))
+
+    return dict(make_item=make_equation, sep="\n", run=run, count_tokens=count_tokens, sizes=[500, 1000, 2000, 4000])
+
+
+def item_engine_maths():
+    """The maths engine of examples/item_engine/example_1, all the lemmas are generated"""
+    from examples.item_engine.example_1.maths import parse
+    from examples.item_engine.example_1.maths.lexer import lexer
+    from item_engine.textbase import make_characters
+
+    def run(text):
+        for _ in parse(make_characters(text, eof=True)):
+            pass
+
+    def count_tokens(text):
+        return sum(1 for _ in lexer(make_characters(text, eof=True)))
+
+    return dict(make_item=make_item_engine_expr, sep=" + ", run=run, count_tokens=count_tokens, sizes=[50, 100, 200])
+
+
+BENCHMARKS = {
+    "text_engine.example_3": text_engine_example_3,
+    "item_engine.maths": item_engine_maths,
+}
+
+
+def measure(benchmark: dict, size: int, repeat: int, seed: int):
+    text = make_text(size, seed, benchmark["make_item"], benchmark["sep"])
+    tokens = benchmark["count_tokens"](text)
+
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        benchmark["run"](text)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    benchmark["run"](text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return dict(
+        size=size,
+        chars=len(text),
+        tokens=tokens,
+        seconds=best,
+        chars_per_second=len(text) / best,
+        tokens_per_second=tokens / best,
+        peak_bytes=peak,
+    )
+
+
+def exponent(runs: list):
+    if len(runs) < 2:
+        return None
+    xs = [math.log(run["chars"]) for run in runs]
+    ys = [math.log(run["seconds"]) for run in runs]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sum((x - mx) ** 2 for x in xs)
+
+
+def run_suite(names=None, sizes=None, repeat: int = 3, seed: int = 0, log=None):
+    results = dict(
+        format=FORMAT_VERSION,
+        python=platform.python_version(),
+        implementation=platform.python_implementation(),
+        machine=platform.machine(),
+        seed=seed,
+        repeat=repeat,
+        benchmarks={},
+        skipped={},
+        failed={},
+    )
+
+    for name in names or BENCHMARKS:
+        try:
+            benchmark = BENCHMARKS[name]()
+        except ImportError as e:
+            # the engines whose dependencies are not installed
+            results["skipped"][name] = f"{e.__class__.__name__}: {e}"
+            if log:
+                log(f"{name:<24} skipped ({e.__class__.__name__}: {e})")
+            continue
+
+        runs = []
+        try:
+            for size in sizes or benchmark["sizes"]:
+                run = measure(benchmark, size, repeat, seed)
+                runs.append(run)
+                if log:
+                    log(f"{name:<24} {run['chars']:>8} chars {run['tokens']:>7} tokens {run['seconds']:>9.4f} s "
+                        f"{run['chars_per_second']:>11.0f} chars/s {run['tokens_per_second']:>10.0f} tokens/s "
+                        f"{run['peak_bytes'] / 2 ** 20:>8.2f} MiB")
+        except Exception as e:
+            results["failed"][name] = f"{e.__class__.__name__}: {e}"
+            if log:
+                log(f"{name:<24} failed ({e.__class__.__name__}: {e})")
+            continue
+
+        results["benchmarks"][name] = dict(doc=BENCHMARKS[name].__doc__, runs=runs, exponent=exponent(runs))
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite of the engines of the repository")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="the benchmarks to run (all by default)")
+    parser.add_argument("--sizes", nargs="+", type=int, help="the sizes of the inputs in characters")
+    parser.add_argument("--repeat", type=int, default=3, help="the number of timed runs per input")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the generated inputs")
+    parser.add_argument("--output", help="the JSON file to write (standard output by default)")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.only, args.sizes, args.repeat, args.seed, log=lambda line: print(line, file=sys.stderr))
+
+    if args.output:
+        with open(args.output, mode="w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    return 1 if results["failed"] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
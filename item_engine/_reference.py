@@ -0,0 +1,30 @@
+"""
+    Previous implementations kept as references, for the tests and the benchmarks of the ones which replaced them
+"""
+from functools import reduce
+from operator import or_
+
+
+def reference_optimized(data):
+    """The previous implementation of ``optimized``, which computes the ItemSet[V] of each item"""
+    explicit = sorted(set(item for isk in data for item in isk.items))
+
+    item_partition = {
+        item: reduce(or_, [isv for isk, isv in data.items() if item in isk])
+        for item in explicit
+    }
+    default = reduce(or_, [isv for isk, isv in data.items() if isk.inverted])
+
+    reverted = {}
+    for v, isk in item_partition.items():
+        if isk in reverted:
+            reverted[isk] |= v.as_group
+        else:
+            reverted[isk] = v.as_group
+
+    if default in reverted:
+        reverted[default] = ~reduce(or_, [item.as_group for item in explicit if item not in reverted[default]])
+    else:
+        reverted[default] = ~reduce(or_, [item.as_group for item in explicit])
+
+    return {isk: isv for isv, isk in reverted.items()}
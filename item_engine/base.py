@@ -1,5 +1,5 @@
 from __future__ import annotations
-from dataclasses import dataclass, replace
+from dataclasses import dataclass, replace, fields
 from typing import Tuple, Iterator, FrozenSet, List, TypeVar, Generic, Type
 from functools import reduce
 from operator import and_
@@ -16,9 +16,49 @@ __all__ = [
     "Empty", "RuleUnit", "RuleList",
     "Optional", "Repeat", "All", "Any",
     "Match",
+    "Interned",
 ]
 
 
+def _cached_hash(self) -> int:
+    return self._hash
+
+
+def _reduce_interned(self):
+    return self.__class__, tuple(getattr(self, name) for name in self.__class__._field_names)
+
+
+class Interned(type):
+    """
+        Metaclass of the frozen dataclasses of the rules and branches : the structurally equal instances are
+        the same object and their hash is computed once (from the cached hashes of their fields),
+        so hashing them in the BranchSets and in the dicts of the build doesn't go through their nested fields
+    """
+    instances: dict = {}
+
+    def __new__(mcs, name, bases, namespace):
+        # defined in the body of each class, so the dataclass decorator doesn't replace them
+        namespace.setdefault("__hash__", _cached_hash)
+        namespace.setdefault("__reduce__", _reduce_interned)
+        return super().__new__(mcs, name, bases, namespace)
+
+    def __call__(cls, *args, **kwargs):
+        obj = super().__call__(*args, **kwargs)
+        try:
+            names = cls.__dict__["_field_names"]
+        except KeyError:
+            names = tuple(field.name for field in fields(cls))
+            type.__setattr__(cls, "_field_names", names)
+
+        object.__setattr__(obj, "_hash", hash((cls, *[getattr(obj, name) for name in names])))
+        return Interned.instances.setdefault(obj, obj)
+
+    @staticmethod
+    def clear() -> None:
+        """Forget the interned instances (the instances still in use stay valid, but are not shared anymore)"""
+        Interned.instances.clear()
+
+
 class HasAlphabet:
     @property
     def alphabet(self) -> FrozenSet[Item]:
@@ -136,7 +176,7 @@ class CanBeSplited:
 ########################################################################################################################
 
 @dataclass(frozen=True, order=True)
-class Rule(HasAlphabet, HasState, CanBeSplited):
+class Rule(HasAlphabet, HasState, CanBeSplited, metaclass=Interned):
     def repeat(self, mn: int = 0, mx: int = INF) -> Rule:
         assert mn >= 0
         assert mx == -1 or (mx >= mn and mx > 0)
@@ -343,7 +383,7 @@ __all__ += ["Branch", "BranchSet"]
 ########################################################################################################################
 
 @dataclass(frozen=True, order=True)
-class Branch(GenericItem, HasAlphabet, HasState, CanBeSplited):
+class Branch(GenericItem, HasAlphabet, HasState, CanBeSplited, metaclass=Interned):
     name: str
     rule: Rule
     priority: int = 0
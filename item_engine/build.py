@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import os
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Callable, Iterator, Tuple, Optional, Type, Union
+from typing import Dict, List, Callable, Iterator, Tuple, Optional, Type, Union, Deque
 
 from python_generator import VAR, DEF, ARGS, INT, IF, BLOCK, STR, LIST, IMPORT, \
     RETURN, YIELD, SWITCH, FSTR, EXCEPTION, MODULE, PACKAGE, STATEMENT, ARG
@@ -260,7 +261,9 @@ class Parser:
         self.formal_outputs: bool = formal_outputs
         self.skips: List[T_STATE] = skips
 
+        # the branch sets in the order of their states, and the registry of their states
         self.branch_sets: List[BranchSet] = [self.branch_set]
+        self.states: Dict[BranchSet, NT_STATE] = {self.branch_set: NT_STATE(0)}
         self.origin_select: OriginSelect = OriginSelect()
 
         self.build()
@@ -270,23 +273,28 @@ class Parser:
             This will iteratively build the cases of the parser
             from the original branchset to all the possible consequent branchsets
         """
-        index = 0
-        while index < len(self.branch_sets):
-            branch_set: BranchSet = self.branch_sets[index]
+        worklist: Deque[BranchSet] = deque(self.branch_sets)
+        while worklist:
+            branch_set: BranchSet = worklist.popleft()
             group_select: GroupSelect = self.extract(branch_set)
             self.origin_select[branch_set] = group_select
-            self.include(group_select)
-            index += 1
+            worklist.extend(self.include(group_select))
 
-    def include(self, group_select: GroupSelect) -> None:
+    def include(self, group_select: GroupSelect) -> List[BranchSet]:
+        """Register the new non-terminal targets of ``group_select`` and return them"""
+        included: List[BranchSet] = []
         for branch_set in group_select.targets:
             if branch_set.is_terminal:
                 continue
 
-            if branch_set in self.branch_sets:
+            if branch_set in self.states:
                 continue
 
+            self.states[branch_set] = NT_STATE(len(self.branch_sets))
             self.branch_sets.append(branch_set)
+            included.append(branch_set)
+
+        return included
 
     def extract(self, branch_set: BranchSet) -> GroupSelect:
         gto: GroupToOutcome = GroupToOutcome.from_branch_set(branch_set).optimized
@@ -294,7 +302,7 @@ class Parser:
         return group_select
 
     def get_nt_state(self, branch_set: BranchSet) -> NT_STATE:
-        return NT_STATE(self.branch_sets.index(branch_set))
+        return self.states[branch_set]
 
     def data(self) -> ParserData:
         return ParserData(
@@ -1,10 +1,10 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import TypeVar, Generic, FrozenSet, Iterable, Type, Dict, List
+from typing import TypeVar, Generic, FrozenSet, Iterable, Iterator, Type, Dict, List, Tuple, Optional
 from functools import reduce
 from operator import or_
 
-__all__ = ["GenericItem", "GenericItemSet", "optimized"]
+__all__ = ["GenericItem", "GenericItemSet", "BitItemSet", "optimized"]
 
 
 @dataclass(frozen=True, order=True)
@@ -175,6 +175,145 @@ class GenericItemSet(Generic[K]):
         return self.inverted and not self.items
 
 
+class BitItemSet(GenericItemSet[K]):
+    """
+        GenericItemSet of a dense alphabet whose items are the bits of an integer ``mask``,
+        the operations on the sets are integer operations, the ``items`` are only made when they are read
+
+        the subclasses give the ``index`` of the items (which must follow their order) and the ``item`` of an index
+    """
+
+    @staticmethod
+    def index(item: K) -> int:
+        raise NotImplementedError
+
+    @staticmethod
+    def item(index: int) -> K:
+        raise NotImplementedError
+
+    @classmethod
+    def from_mask(cls: Type[T], mask: int, inverted: bool = False) -> T[K]:
+        self = cls.__new__(cls)
+        self.mask = mask
+        self.inverted = inverted
+        return self
+
+    def __init__(self, items: Iterable[K] = None, inverted: bool = False):
+        mask = 0
+        indexes = [self.index(item) for item in items] if items is not None else []
+        if indexes:
+            bits = bytearray(max(indexes) // 8 + 1)
+            for index in indexes:
+                bits[index >> 3] |= 1 << (index & 7)
+            mask = int.from_bytes(bits, "little")
+        self.mask: int = mask
+        self.inverted: bool = inverted
+
+    @property
+    def indexes(self) -> Iterator[int]:
+        """the indexes of the items, in order"""
+        bits = bin(self.mask)[:1:-1]
+        index = bits.find("1")
+        while index != -1:
+            yield index
+            index = bits.find("1", index + 1)
+
+    @property
+    def items(self) -> FrozenSet[K]:
+        try:
+            return self.__dict__["_items"]
+        except KeyError:
+            items = self.__dict__["_items"] = frozenset(map(self.item, self.indexes))
+            return items
+
+    def __hash__(self) -> int:
+        """return hash(self)"""
+        return hash((type(self), self.mask, self.inverted))
+
+    def __contains__(self, obj: K) -> bool:
+        """return obj in self"""
+        return bool(self.mask >> self.index(obj) & 1) != self.inverted
+
+    def __eq__(self: T[K], other: T[K]) -> bool:
+        if type(other) is type(self):
+            return self.inverted == other.inverted and self.mask == other.mask
+        return super().__eq__(other)
+
+    def __or__(self: T[K], other: T[K]) -> T[K]:
+        """return self | other"""
+        if type(other) is not type(self):
+            return super().__or__(other)
+
+        if self.inverted:
+            if other.inverted:
+                mask = self.mask & other.mask
+            else:
+                mask = self.mask & ~other.mask
+        else:
+            if other.inverted:
+                mask = other.mask & ~self.mask
+            else:
+                mask = self.mask | other.mask
+
+        return self.from_mask(mask, self.inverted or other.inverted)
+
+    __ior__ = __or__
+
+    def __and__(self: T[K], other: T[K]) -> T[K]:
+        """return self & other"""
+        if type(other) is not type(self):
+            return super().__and__(other)
+
+        if self.inverted:
+            if other.inverted:
+                mask = self.mask | other.mask
+            else:
+                mask = other.mask & ~self.mask
+        else:
+            if other.inverted:
+                mask = self.mask & ~other.mask
+            else:
+                mask = self.mask & other.mask
+
+        return self.from_mask(mask, self.inverted and other.inverted)
+
+    __iand__ = __and__
+
+    def __truediv__(self: T[K], other: T[K]) -> T[K]:
+        """return self / other"""
+        if type(other) is not type(self):
+            return super().__truediv__(other)
+
+        if self.inverted:
+            if other.inverted:
+                mask = other.mask & ~self.mask
+            else:
+                mask = self.mask | other.mask
+        else:
+            if other.inverted:
+                mask = self.mask & other.mask
+            else:
+                mask = self.mask & ~other.mask
+
+        return self.from_mask(mask, self.inverted and not other.inverted)
+
+    __itruediv__ = __truediv__
+
+    def __invert__(self: T[K]) -> T[K]:
+        """return ~self"""
+        return self.from_mask(self.mask, not self.inverted)
+
+    @property
+    def is_never(self) -> bool:
+        """return self == ∅"""
+        return not self.inverted and not self.mask
+
+    @property
+    def is_always(self) -> bool:
+        """return self == Ω"""
+        return self.inverted and not self.mask
+
+
 ISK = TypeVar("ISK", bound=GenericItemSet)
 ISV = TypeVar("ISV", bound=GenericItemSet)
 
@@ -190,30 +329,95 @@ def optimized(data: Dict[ISK, ISV]) -> Dict[ISK, ISV]:
         this function basically make an optimized mapping equivalent to the initial one
         which avoid ambiguity and reduces the amount of item sets required
     """
+    bit_item_set = _bit_item_set(data)
+    if bit_item_set is not None:
+        return _optimized_masks(data, bit_item_set)
+
+    entries: List[Tuple[ISK, ISV]] = list(data.items())
     explicit: List = sorted(set(item for isk in data for item in isk.items))
 
-    item_partition: Dict[GenericItem, ISV] = {
-        item: reduce(or_, [isv for isk, isv in data.items() if item in isk])
-        for item in explicit
-    }
+    # the explicit items are partitioned by the ItemSet[K] which list them,
+    # the items of a part map to the same ItemSet[V], so it is computed once per part instead of once per item
+    parts: Dict[GenericItem, List[int]] = {item: [] for item in explicit}
+    for index, (isk, _) in enumerate(entries):
+        for item in isk.items:
+            parts[item].append(index)
+
+    part_partition: Dict[Tuple[int, ...], ISV] = {}
+    item_partition: Dict[ISV, List[GenericItem]] = {}
+    for item in explicit:
+        part = tuple(parts[item])
+        isv = part_partition.get(part)
+        if isv is None:
+            # the item is in the non-inverted ItemSet[K] which list it and in the inverted ones which don't
+            listed = set(part)
+            isv = part_partition[part] = reduce(or_, [value for index, (isk, value) in enumerate(entries)
+                                                      if (index in listed) != isk.inverted])
+        if isv in item_partition:
+            item_partition[isv].append(item)
+        else:
+            item_partition[isv] = [item]
+
     default: ISV = reduce(or_, [isv for isk, isv in data.items() if isk.inverted])
+    make_isk = type(explicit[0].as_group) if explicit else type(entries[0][0])
 
     # this step makes sure to regroup all the K items that maps to the same ItemSet[V]
-    reverted: Dict[ISV, ISK] = {}
-    for v, isk in item_partition.items():
-        if isk in reverted:
-            reverted[isk] |= v.as_group
-        else:
-            reverted[isk] = v.as_group
+    reverted: Dict[ISV, ISK] = {isv: make_isk(items) for isv, items in item_partition.items()}
 
     if default in reverted:
         # if there's an ItemSet[K] which maps to the default ItemSet[V]
         # (which is the map of all the non-explicit items)
         # then we revert the ItemSet[K] using all the explicit items
-        reverted[default] = ~reduce(or_, [item.as_group for item in explicit if item not in reverted[default]])
+        reverted[default] = make_isk([item for item in explicit if item not in reverted[default].items], True)
     else:
         # else, it just revert the whole explicit (as default ItemSet[V] is mapped from no explicit item)
-        reverted[default] = ~reduce(or_, [item.as_group for item in explicit])
+        reverted[default] = make_isk(explicit, True)
+
+    item_set_partition: Dict[ISK, ISV] = {isk: isv for isv, isk in reverted.items()}
+
+    return item_set_partition
+
+
+def _bit_item_set(data: Dict[ISK, ISV]) -> Optional[Type[BitItemSet]]:
+    """The BitItemSet class of all the ItemSet[K] with items, None if there are others"""
+    found = None
+    for isk in data:
+        if isinstance(isk, BitItemSet):
+            if found is None:
+                found = type(isk)
+            elif type(isk) is not found:
+                return None
+        elif isk.items:
+            return None
+    return found
+
+
+def _optimized_masks(data: Dict[ISK, ISV], make_isk: Type[BitItemSet]) -> Dict[ISK, ISV]:
+    """``optimized`` on the masks of the ItemSet[K], the parts of the items are refined by each ItemSet[K]"""
+    entries: List[Tuple[ISK, ISV]] = list(data.items())
+    masks: List[int] = [isk.mask if isinstance(isk, BitItemSet) else 0 for isk in data]
+    explicit: int = reduce(or_, masks, 0)
+
+    parts: List[int] = [explicit] if explicit else []
+    for mask in masks:
+        if mask:
+            parts = [part for whole in parts for part in (whole & mask, whole & ~mask) if part]
+
+    # the parts are visited in the order of their first item, as the items in ``optimized``
+    parts.sort(key=lambda part: part & -part)
+
+    item_partition: Dict[ISV, int] = {}
+    for part in parts:
+        isv = reduce(or_, [value for mask, (isk, value) in zip(masks, entries) if bool(part & mask) != isk.inverted])
+        item_partition[isv] = item_partition.get(isv, 0) | part
+
+    default: ISV = reduce(or_, [isv for isk, isv in data.items() if isk.inverted])
+
+    reverted: Dict[ISV, ISK] = {isv: make_isk.from_mask(mask) for isv, mask in item_partition.items()}
+    if default in item_partition:
+        reverted[default] = make_isk.from_mask(explicit & ~item_partition[default], True)
+    else:
+        reverted[default] = make_isk.from_mask(explicit, True)
 
     item_set_partition: Dict[ISK, ISV] = {isk: isv for isv, isk in reverted.items()}
 
@@ -2,12 +2,23 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from item_engine import Item, Group, Match
+from item_engine.generic_items import BitItemSet
 import python_generator as pg
 
 __all__ = ["CharI", "CharG"]
 
 
-class CharG(Group):
+class CharG(BitItemSet, Group):
+    """Group of characters, the bits of its mask are the code points of its characters"""
+
+    @staticmethod
+    def index(item: CharI) -> int:
+        return ord(item.char)
+
+    @staticmethod
+    def item(index: int) -> CharI:
+        return CharI(chr(index))
+
     @property
     def items_str(self) -> str:
         s = ''.join(sorted(repr(str(item))[1:-1] for item in self.items))
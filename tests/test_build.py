@@ -0,0 +1,142 @@
+import pickle
+import random
+import unittest
+from functools import reduce
+from operator import or_
+from item_engine._reference import reference_optimized
+from item_engine.base import VALID
+from item_engine.generic_items import GenericItemSet, optimized
+from item_engine.textbase import *
+
+
+def make_keywords_parser(*keywords: str) -> Parser:
+    lexer, _, _ = MakeLexer(branches={f"KW_{index}": string(keyword) for index, keyword in enumerate(keywords)})
+    return Parser(name="keywords", branch_set=lexer, input_cls=Char, output_cls=Token, skips=[],
+                  reflexive=False, formal_inputs=False, formal_outputs=False)
+
+
+class TestBuild(unittest.TestCase):
+    def test_states(self):
+        parser = make_keywords_parser("abc", "abd", "ab", "b", "bcd")
+        self.assertEqual(len(parser.states), len(parser.branch_sets))
+        for index, branch_set in enumerate(parser.branch_sets):
+            self.assertEqual(parser.get_nt_state(branch_set), index)
+        self.assertEqual(set(parser.origin_select), set(parser.branch_sets))
+
+    def test_targets(self):
+        parser = make_keywords_parser("if", "in", "int", "for", "form")
+        for group_select in parser.origin_select.values():
+            for branch_set in group_select.targets:
+                if not branch_set.is_terminal:
+                    self.assertIn(branch_set, parser.states)
+
+        # the shared prefixes share their states : "", "i", "in", "f", "fo", "for" ("int" and "form" are terminal)
+        self.assertEqual(len(parser.branch_sets), 6)
+
+
+class TestInterned(unittest.TestCase):
+    def setUp(self):
+        # test_pickle forgets the interned instances, the other tests of the process still share theirs
+        self.instances = dict(Interned.instances)
+
+    def tearDown(self):
+        Interned.instances.clear()
+        Interned.instances.update(self.instances)
+
+    def test_identity(self):
+        rule = string("abc") & charset("xy").inc().repeat(0, INF)
+        self.assertIs(string("abc") & charset("yx").inc().repeat(0, INF), rule)
+        self.assertIs(Empty(True), VALID)
+        self.assertIsNot(Optional(rule), Repeat(rule))
+        self.assertNotEqual(Optional(rule), Repeat(rule))
+
+        branch = Branch(name="A", rule=rule)
+        self.assertIs(branch.new_rule(string("x")).new_rule(rule), branch)
+        self.assertIsNot(Branch(name="B", rule=rule), branch)
+
+    def test_pickle(self):
+        rule = Any((string("ab"), string("c").optional))
+        branch = Branch(name="A", rule=rule, priority=1)
+        self.assertIs(pickle.loads(pickle.dumps(rule)), rule)
+        self.assertIs(pickle.loads(pickle.dumps(branch)), branch)
+
+        data = pickle.dumps(branch)
+        Interned.clear()
+        copy = pickle.loads(data)
+        self.assertIsNot(copy, branch)
+        self.assertEqual(copy, branch)
+        self.assertEqual(hash(copy), hash(branch))
+
+
+class TestOptimized(unittest.TestCase):
+    @staticmethod
+    def random_data(rng: random.Random, group_cls=CharG, item_cls=CharI):
+        def group(alphabet: str, size: int, inverted: bool):
+            return group_cls(frozenset(map(item_cls, rng.sample(alphabet, rng.randint(0, size)))), inverted)
+
+        return {
+            group("abcdefghij", 6, rng.random() < 0.4): group("0123456789", 3, rng.random() < 0.2)
+            for _ in range(rng.randint(1, 8))
+        }
+
+    def test_random(self):
+        # the groups of characters are optimized on their masks, the groups of tokens on their items
+        for group_cls, item_cls in ((CharG, CharI), (TokenG, TokenI)):
+            rng = random.Random(0)
+            compared = 0
+            for _ in range(2000):
+                data = self.random_data(rng, group_cls, item_cls)
+                try:
+                    expected = reference_optimized(data)
+                except TypeError:
+                    # the mappings which don't map all the items, or map them all to the default
+                    continue
+
+                result = optimized(data)
+                self.assertEqual(list(result.items()), list(expected.items()), data)
+                self.assertEqual([type(isk) for isk in result], [type(isk) for isk in expected])
+                compared += 1
+
+            self.assertGreater(compared, 1000)
+
+    def test_partition(self):
+        for data in (self.random_data(random.Random(seed)) for seed in range(200)):
+            try:
+                result = optimized(data)
+            except TypeError:
+                continue
+
+            for item in map(CharI, "abcdefghijk"):
+                isks = [isk for isk in result if item in isk]
+                self.assertEqual(len(isks), 1)
+                self.assertEqual(result[isks[0]], reduce(or_, [isv for isk, isv in data.items() if item in isk]))
+
+
+class TestBitItemSet(unittest.TestCase):
+    def test_algebra(self):
+        rng = random.Random(0)
+        alphabet = "abcdefgh" + "é∀" + chr(0x1F600)
+        for _ in range(500):
+            a, b = (CharG(map(CharI, rng.sample(alphabet, rng.randint(0, 5))), rng.random() < 0.5) for _ in range(2))
+            plain_a, plain_b = (GenericItemSet(group.items, group.inverted) for group in (a, b))
+            for result, expected in ((a | b, plain_a | plain_b), (a & b, plain_a & plain_b),
+                                     (a / b, plain_a / plain_b), (~a, ~plain_a)):
+                self.assertIsInstance(result, CharG)
+                self.assertEqual((result.items, result.inverted), (expected.items, expected.inverted))
+            self.assertEqual(a <= b, plain_a <= plain_b)
+            for char in alphabet:
+                self.assertEqual(CharI(char) in a, CharI(char) in plain_a)
+
+    def test_items(self):
+        group = charset("zaé€")
+        self.assertEqual(group.mask, sum(1 << ord(char) for char in "zaé€"))
+        self.assertEqual(list(group.indexes), sorted(map(ord, "zaé€")))
+        self.assertEqual(group.items, frozenset(map(CharI, "zaé€")))
+        self.assertEqual(group, CharG(map(CharI, "€éaz")))
+        self.assertEqual(hash(group), hash(CharG(map(CharI, "€éaz"))))
+        self.assertTrue(CharG.never().is_never)
+        self.assertTrue((~CharG.never()).is_always)
+
+
+if __name__ == '__main__':
+    unittest.main()
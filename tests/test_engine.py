@@ -0,0 +1,275 @@
+import unittest
+from text_engine import *
+from text_engine.core.Engine import EngineTokenizeError, EngineReadError
+from text_engine.core.Parser import ParseError
+from text_engine.core.TokenWindow import DiscardedTokenError
+from tests.test_parser import make_engine, make_left_engine
+import random
+
+
+class TestStreaming(unittest.TestCase):
+    def test_items(self):
+        engine = make_engine()
+        texts = ["1 + 2", "3 * 4", "(5 - 6)"]
+        self.assertEqual(list(engine.i_read("\n".join(texts), "Expr")), [engine.read(text, "Expr") for text in texts])
+
+    def test_bounded(self):
+        for engine in (make_engine(), make_engine(packrat=True)):
+            text = "1 + 2 * 3\n" * 500
+            tokens = TokenWindow(engine.lexer.i_tokenize(text))
+            items = list(engine._read_window(tokens, "Expr"))
+            self.assertEqual(len(items), 500)
+            self.assertLessEqual(tokens.peak, 6)
+
+    def test_window(self):
+        tokens = TokenWindow(make_engine().lexer.i_tokenize("1 + 2"))
+        self.assertEqual(tokens[2].value, 2)
+        self.assertTrue(tokens.at_end(3))
+        with self.assertRaises(IndexError):
+            tokens[3]
+        tokens.discard(2)
+        with self.assertRaises(DiscardedTokenError):
+            tokens[0]
+
+    def test_errors(self):
+        engine = make_engine()
+        with self.assertRaises(ParseError):
+            list(engine.i_read("1 + 2 )", "Expr"))
+        with self.assertRaises(EngineTokenizeError):
+            list(engine.i_read("1 + a", "Expr"))
+
+
+class TestReadMany(unittest.TestCase):
+    TEXTS = ["1 + 2", "3 * (4 - 5)", "1 + a", "6", "7 +"] * 4
+
+    def test_ordered(self):
+        engine = make_engine(packrat=True)
+        expected = [engine.read(text, "Expr") if "a" not in text else None for text in self.TEXTS]
+        for workers in (0, 2):
+            results = list(engine.read_many(self.TEXTS, "Expr", workers=workers, chunksize=3))
+            self.assertEqual(len(results), len(self.TEXTS))
+            for text, ast, result in zip(self.TEXTS, expected, results):
+                if "a" in text:
+                    self.assertIsInstance(result, EngineReadError)
+                    self.assertEqual(result.error_type, "EngineTokenizeError")
+                else:
+                    self.assertEqual(result, ast)
+
+    def test_unordered(self):
+        engine = make_engine()
+        results = dict(engine.read_many(iter(self.TEXTS), "Expr", workers=2, ordered=False))
+        self.assertEqual(sorted(results), list(range(len(self.TEXTS))))
+        self.assertEqual(results[1], engine.read(self.TEXTS[1], "Expr"))
+
+
+class Node:
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+    def __eq__(self, other):
+        return type(self) is type(other) and (self.args, self.kwargs) == (other.args, other.kwargs)
+
+
+class Add(Node):
+    pass
+
+
+class Int(Node):
+    pass
+
+
+class Par(Node):
+    def __len__(self):
+        return 0
+
+
+class TestDirectAST(unittest.TestCase):
+    TEXTS = ["1", "1 + 2 * 3", "(4 - (5 + 6)) * 7", "(0)"]
+
+    def test_same_ast(self):
+        astb = ASTB(Add, Int, Par)
+        engine = make_engine()
+        direct = make_engine()
+        direct.astb = astb
+        for text in self.TEXTS:
+            ast = direct.read(text, "Expr")
+            self.assertEqual(ast, astb(engine.read(text, "Expr")))
+            self.assertIsInstance(ast, (Add, Int, Par, dict))
+
+    def test_falsy_object(self):
+        engine = make_engine()
+        engine.astb = ASTB(Par, Int)
+        self.assertEqual(engine.read("(0)", "Expr"), Par(Int(value=0)))
+
+
+def make_document_engine(cls=Engine, make=make_engine, **config):
+    engine = make()
+    engine.lexer.add_pattern("SEMI", mode="str", expr=";")
+    engine.lexer.add_pattern("ID", mode="re", expr="[a-z]+")
+    engine.parser.add_builder("Var", match("ID as name"))
+    engine.parser.builders[-2].rule = match("Par") | match("Int") | match("Var")
+    engine.parser.add_builder("Doc", (match("Expr in *") & match("SEMI")).repeat)
+    return cls(engine.lexer, engine.parser, **config)
+
+
+class TestIncremental(unittest.TestCase):
+    TEXT = "1 + 2 * x;\n(3 - y) * 4;\n" * 20
+
+    def check_random_edits(self, count: int, make=make_engine):
+        random.seed(0)
+        incremental = make_document_engine(IncrementalEngine, make, identifier="Doc")
+        reference = make_document_engine(make=make, packrat=True)
+        text = self.TEXT
+        self.assertEqual(incremental.read(text), reference.read(text, "Doc"))
+
+        for _ in range(count):
+            offset = random.randint(0, len(text))
+            removed = random.randint(0, min(3, len(text) - offset))
+            inserted = "".join(random.choice("12 x+-*;()") for _ in range(random.randint(0, 3)))
+            text = text[:offset] + inserted + text[offset + removed:]
+            self.assertEqual(incremental.edit(offset, removed, inserted), reference.read(text, "Doc"), text)
+
+            tokens = incremental.tokens
+            self.assertEqual(
+                [(token.content, tokens.at_index(rank)) for rank, token in enumerate(tokens)],
+                [(token.content, token.at_index) for token in reference.lexer.tokenize(text)]
+            )
+            labels = [token.at_position for token in tokens] + [tokens.end]
+            self.assertEqual(labels, sorted(set(labels)))
+            self.assertEqual([token.to_position for token in tokens], labels[1:])
+
+    def test_random_edits(self):
+        self.check_random_edits(200)
+
+    def test_left_random_edits(self):
+        # the results of the left recursions are pinned while they grow and forgotten after
+        self.check_random_edits(200, make_left_engine)
+
+    def test_relabel(self):
+        # labels 2 apart leave no room for most edits, which label the tokens before them again,
+        # labels 1 apart leave none at all, so every edit adding tokens labels them all again
+        self.addCleanup(setattr, LabeledTokens, "SPACING", LabeledTokens.SPACING)
+        for spacing in (2, 1):
+            with self.subTest(spacing=spacing):
+                LabeledTokens.SPACING = spacing
+                self.check_random_edits(50)
+
+    def test_kept_tokens(self):
+        engine = make_document_engine(IncrementalEngine, identifier="Doc")
+        engine.read(self.TEXT)
+        tokens = list(engine.tokens)
+        labels = [token.at_position for token in tokens]
+
+        engine.edit(self.TEXT.index("x"), 1, "zz")
+        self.assertEqual(len(engine.tokens), len(tokens))
+        # the tokens after the edit are the same, with the same labels and their indexes moved by the edit
+        for rank in range(8, len(tokens)):
+            self.assertIs(engine.tokens.tokens[rank], tokens[rank])
+            self.assertEqual(tokens[rank].at_position, labels[rank])
+        self.assertEqual(engine.tokens.at_index(len(tokens) - 1), self.TEXT.rindex(";") + 1)
+
+    def test_own_parser(self):
+        engine = make_document_engine()
+        incremental = IncrementalEngine(engine.lexer, engine.parser, identifier="Doc")
+        self.assertIsNotNone(incremental.read(self.TEXT))
+        self.assertFalse(engine.parser.packrat)
+        self.assertNotIn("apply_steps", vars(engine.parser))
+        self.assertEqual(incremental.read(self.TEXT), engine.read(self.TEXT, "Doc"))
+
+    def test_reuse(self):
+        engine = make_document_engine(IncrementalEngine, identifier="Doc")
+        self.assertIsNotNone(engine.read(self.TEXT))
+        full = engine.parser.memo.misses
+
+        engine.parser.memo.misses = 0
+        ast = engine.edit(self.TEXT.index("x"), 1, "zz")
+        self.assertEqual(ast, make_document_engine().read(self.TEXT.replace("x", "zz", 1), "Doc"))
+        self.assertLess(engine.parser.memo.misses * 10, full)
+
+    def test_profiled(self):
+        engine = make_document_engine(IncrementalEngine, identifier="Doc")
+        applied = engine.parser.apply_steps
+        engine.read("1 + 2;")
+        with Profiler(engine.parser) as profiler:
+            self.assertIsNone(engine.edit(5, 1, ""))
+        self.assertGreater(profiler.stats["Doc"].calls, 0)
+        self.assertEqual(engine.parser.apply_steps, applied)
+        self.assertEqual(engine.edit(4, 1, "3;"), make_document_engine().read("1 + 3;", "Doc"))
+
+    def test_tokenize_error(self):
+        engine = make_document_engine(IncrementalEngine, identifier="Doc")
+        engine.read("1;")
+        with self.assertRaises(EngineTokenizeError):
+            engine.edit(1, 0, "@")
+        self.assertIsNotNone(engine.edit(1, 1, ""))
+
+
+def make_ambiguous_engine():
+    engine = make_engine()
+    parser = Parser()
+    parser.add_builder("Add", match("Expr in *") & match("PLUS") & match("Expr in *"))
+    parser.add_builder("Mul", match("Expr in *") & match("STAR") & match("Expr in *"))
+    parser.add_builder("Pair", match("Int in *") & match("Int in *"))
+    parser.add_routine("Expr", match("Add") | match("Mul") | match("Pair") | match("Seq") | match("Int"))
+    parser.add_builder("Seq", match("Int in *") & match("Expr in *"))
+    parser.add_builder("Int", match("INT as value"))
+    return Engine(engine.lexer, parser)
+
+
+class TestForest(unittest.TestCase):
+    def test_count(self):
+        engine = make_ambiguous_engine()
+        # the number of binary trees over n operands
+        catalan = [1, 1, 2, 5, 14, 42, 132, 429]
+        for size, expected in enumerate(catalan, start=1):
+            self.assertEqual(engine.forest(" + ".join(["1"] * size), "Expr").count(), expected)
+            self.assertEqual(engine.forest(" * ".join(["1"] * size), "Expr", backward=True).count(), expected)
+
+        # too many to enumerate
+        self.assertEqual(engine.forest(" + ".join(["1"] * 41), "Expr").count(), 2622127042276492108820)
+
+    def test_trees(self):
+        engine = make_ambiguous_engine()
+        asts = list(engine.read_all("1 + 2 * 3", "Expr"))
+        self.assertEqual(len(asts), 2)
+        self.assertEqual(asts[0]["__class__"], "Add")
+        self.assertEqual(asts[1]["__class__"], "Mul")
+        self.assertNotIn(None, asts)
+
+        forest = engine.forest("1 2", "*")
+        self.assertEqual([builder.identifier for builder in forest.roots], ["Pair", "Expr", "Seq"])
+        # Expr is a Pair or a Seq
+        self.assertEqual(forest.count(), 4)
+
+    def test_first(self):
+        for engine, backward in ((make_engine(), False), (make_left_engine(packrat=True), False),
+                                 (make_left_engine(), True)):
+            for text in TestDirectAST.TEXTS:
+                forest = engine.forest(text, "Expr", backward=backward)
+                self.assertEqual(forest.count(), 1)
+                self.assertEqual(next(engine.read_all(text, "Expr", backward=backward)),
+                                 engine.read(text, "Expr", backward=backward))
+
+    def test_best(self):
+        engine = make_ambiguous_engine()
+        forest = engine.forest("1 2 3", "Expr")
+        self.assertEqual(forest.count(), 2)
+
+        def inner(result):
+            return next(engine._make_asts([result]))["*"][1]["__class__"]
+
+        # Seq(1, Pair(2, 3)) comes first, Seq(1, Seq(2, 3)) has more Seq
+        self.assertEqual(inner(forest.first()), "Pair")
+        self.assertEqual(inner(forest.best(lambda builder: 0)), "Pair")
+        self.assertEqual(inner(forest.best(lambda builder: builder.identifier == "Seq")), "Seq")
+
+    def test_empty(self):
+        forest = make_ambiguous_engine().forest("1 +", "Expr")
+        self.assertFalse(forest)
+        self.assertEqual(forest.count(), 0)
+        self.assertIsNone(forest.first())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+import unittest
+from re import IGNORECASE
+from text_engine import *
+from text_engine.utils.base import PATTERN_LIBS
+
+TEXT = "x = 3.14 * 'it''s' + f(2, y_1) ≠ α - \"τ\" ; ∀ ε > 0.5 ... 12."
+
+
+def make_lexer(**config):
+    lexer = Lexer(**config)
+    for patterns in PATTERN_LIBS.values():
+        for pattern_config in patterns:
+            lexer.add_pattern(**pattern_config)
+    lexer.add_pattern("WHITESPACE", mode="re", expr="[ \t\n]+", ignore=True, priority=300)
+    lexer.add_pattern("ERROR", mode="re", expr=".+", flag=16, priority=300)
+    return lexer
+
+
+def signature(tokens):
+    return [(token.pattern.identifier, token.content, token.value, token.at_index, token.at_position) for token in tokens]
+
+
+class TestCompiled(unittest.TestCase):
+    def test_same_tokens(self):
+        plain = make_lexer()
+        compiled = make_lexer(compiled=True)
+        self.assertEqual(signature(plain.tokenize(TEXT)), signature(compiled.tokenize(TEXT)))
+
+    def test_folded(self):
+        lexer = make_lexer(compiled=True)
+        matchers = lexer.get_matchers("a")
+        self.assertEqual(len(matchers), 1)
+        self.assertIsInstance(matchers[0], PatternGroup)
+
+    def test_kw(self):
+        lexer = Lexer(compiled=True)
+        lexer.add_pattern("IF", mode="kw", expr="if")
+        lexer.add_pattern("ID", mode="re", expr="[a-z]+")
+        lexer.add_pattern("WHITESPACE", mode="re", expr=" +", ignore=True)
+        tokens = lexer.tokenize("if iff fi")
+        self.assertEqual([token.pattern.identifier for token in tokens], ["IF", "ID", "ID"])
+
+    def test_empty_match(self):
+        lexer = Lexer(compiled=True)
+        lexer.add_pattern("OPT", mode="re", expr="a*")
+        lexer.add_pattern("B", mode="str", expr="b")
+        self.assertEqual([token.content for token in lexer.tokenize("aab")], ["aa", "b"])
+
+    def test_not_folded(self):
+        lexer = Lexer(compiled=True)
+        lexer.add_pattern("DOUBLE", mode="re", expr=r"(.)\1")
+        lexer.add_pattern("ANY", mode="re", expr=".")
+        self.assertIsInstance(lexer.get_matchers("a")[0], Pattern)
+        self.assertEqual([token.content for token in lexer.tokenize("aabcc")], ["aa", "b", "cc"])
+
+    def test_patterns_added_later(self):
+        lexer = Lexer(compiled=True)
+        lexer.add_pattern("A", mode="str", expr="a")
+        self.assertEqual(len(lexer.tokenize("aa")), 2)
+        lexer.add_pattern("AA", mode="str", expr="aa", priority=-1)
+        self.assertEqual(len(lexer.tokenize("aa")), 1)
+
+    def test_lookup(self):
+        lexer = make_lexer()
+        (pattern,) = lexer.get_all_matching_patterns("WHITESPACE")
+        replacement = Pattern("WHITESPACE", mode="re", expr=" +", ignore=True)
+        lexer.patterns[lexer.patterns.index(pattern)] = replacement
+        self.assertEqual(lexer.get_all_matching_patterns("WHITESPACE"), (replacement,))
+
+    def test_index(self):
+        lexer = make_lexer(compiled=True)
+        expected = [("PLUS.SYMBOL", "+", "+", 2, 0), ("INT", "2", 2, 4, 1)]
+        self.assertEqual(signature(lexer.tokenize("1 + 2", index=2)), expected)
+
+
+class TestDispatch(unittest.TestCase):
+    def test_first_chars(self):
+        self.assertEqual(Pattern("PLUS", mode="str", expr="+").first_chars, {"+"})
+        self.assertEqual(Pattern("INT", mode="re", expr="[0-9]+").first_chars, set("0123456789"))
+        self.assertEqual(Pattern("X", mode="re", expr="(a|bc)?d").first_chars, set("abd"))
+        self.assertEqual(Pattern("IF", mode="kw", expr="if").first_chars, {"i"})
+        self.assertIsNone(Pattern("ERROR", mode="re", expr=".+").first_chars)
+        self.assertIsNone(Pattern("X", mode="re", expr="[^a]").first_chars)
+        self.assertIsNone(Pattern("X", mode="re", expr="ab", flag=IGNORECASE).first_chars)
+
+    def test_candidates(self):
+        lexer = make_lexer()
+        candidates = lexer.get_matchers("α")
+        self.assertEqual([pattern.identifier for pattern in candidates], ["ALPHA", "ERROR"])
+        self.assertEqual([pattern.identifier for pattern in lexer.get_matchers("\x00")], ["ERROR"])
+
+    def test_same_tokens(self):
+        plain = make_lexer()
+        plain.build_index = lambda patterns: ({}, plain.build_matchers(patterns))
+        self.assertEqual(signature(plain.tokenize(TEXT)), signature(make_lexer().tokenize(TEXT)))
+
+
+KEYWORDS = ["if", "elif", "else", "for", "while", "in", "is", "import", "from", "return", "not", "and", "or"]
+
+
+def make_keyword_lexer(**config):
+    lexer = Lexer(**config)
+    for keyword in KEYWORDS:
+        lexer.add_pattern(keyword.upper(), mode="kw", expr=keyword)
+    lexer.add_pattern("IN_2", mode="kw", expr="in")
+    lexer.add_pattern("ID", mode="re", expr=r"\w+", priority=1)
+    lexer.add_pattern("OTHER", mode="re", expr=r"[^\w ]", priority=1)
+    lexer.add_pattern("WHITESPACE", mode="re", expr=" +", ignore=True, priority=1)
+    return lexer
+
+
+class TestKeywords(unittest.TestCase):
+    TEXT = "if x in y: return not a or b_if\nelse: import iff.for _in elif2 is α"
+
+    def test_grouped(self):
+        matchers = make_keyword_lexer().get_matchers("i")
+        self.assertIsInstance(matchers[0], KeywordSet)
+        self.assertEqual([pattern.identifier for pattern in matchers[0].patterns], ["IF", "IN", "IS", "IMPORT", "IN_2"])
+
+    def test_same_tokens(self):
+        # the patterns tried one by one, in priority order
+        lexer = make_keyword_lexer()
+        patterns = sorted(lexer.patterns, key=lambda pattern: pattern.priority)
+        lexer.build_index = lambda _: ({}, patterns)
+        expected = signature(lexer.tokenize(self.TEXT + "\n"))
+
+        for config in (dict(), dict(compiled=True)):
+            self.assertEqual(signature(make_keyword_lexer(**config).tokenize(self.TEXT + "\n")), expected)
+
+        identifiers = [identifier for identifier, *_ in expected]
+        self.assertEqual(identifiers[:4], ["IF", "ID", "IN", "ID"])
+        self.assertNotIn("IN_2", identifiers)
+        self.assertEqual(identifiers.count("ID"), 8)
+
+
+class TestShortcuts(unittest.TestCase):
+    TEXT = TEXT + "\n\t  (1 +  2)   *\n\n   x ,y\t\t"
+
+    def test_run_chars(self):
+        self.assertEqual(Pattern("WS", mode="re", expr="[ \t]+").run_chars, frozenset(" \t"))
+        self.assertEqual(Pattern("A", mode="re", expr="a+").run_chars, frozenset("a"))
+        for expr in ("[ \t]*", "[^ ]+", "\\s+", "ab+", "[a-z]+b"):
+            self.assertIsNone(Pattern("P", mode="re", expr=expr).run_chars, expr)
+        self.assertIsNone(Pattern("P", mode="re", expr="[a-z]+", flag=IGNORECASE).run_chars)
+
+    def test_same_tokens(self):
+        for compiled in (False, True):
+            lexer = make_lexer(compiled=compiled)
+            plain = make_lexer(compiled=compiled)
+            plain.build_shortcuts = lambda patterns: ({}, {})
+            self.assertEqual(signature(lexer.tokenize(self.TEXT)), signature(plain.tokenize(self.TEXT)))
+
+    def test_tables(self):
+        lexer = make_lexer()
+        lexer.get_index()
+        self.assertEqual(lexer._runs[" "].identifier, "WHITESPACE")
+        self.assertEqual(lexer._literals["+"].identifier, "PLUS.SYMBOL")
+        # "." can start a FLOAT, which comes before PERIOD
+        self.assertNotIn(".", lexer._literals)
+
+    def test_priority(self):
+        lexer = Lexer()
+        lexer.add_pattern("ARROW", mode="str", expr="->")
+        lexer.add_pattern("MINUS", mode="str", expr="-", priority=1)
+        lexer.add_pattern("WHITESPACE", mode="re", expr=" +", ignore=True, priority=1)
+        self.assertEqual([token.pattern.identifier for token in lexer.tokenize("-> -  ->")], ["ARROW", "MINUS", "ARROW"])
+
+        # a pattern whose first characters are unknown comes before the others
+        lexer.add_pattern("ANY", mode="re", expr="(?s:.)", priority=-1)
+        self.assertEqual(len(lexer.tokenize("-> -")), 4)
+        self.assertEqual(lexer._literals, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
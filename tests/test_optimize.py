@@ -0,0 +1,141 @@
+import os
+import pickle
+import tempfile
+import unittest
+from text_engine import *
+from text_engine.utils.optimize import Optimized_Match, Optimized_Token, OptimizeError, check, _read
+from text_engine.core.Parser import ParseError
+from tests.test_parser import make_engine, make_left_engine, TestLeftRecursion
+
+TEXTS = TestLeftRecursion.TEXTS + ["", "1 +", "(1", "1 2", "a"]
+
+
+class TestOptimize(unittest.TestCase):
+    def test_equivalent(self):
+        for engine in (make_engine(), make_engine(packrat=True)):
+            optimize(engine, TEXTS)
+
+    def test_left_recursion(self):
+        engine = make_left_engine(packrat=True)
+        optimize(engine, TEXTS, "Expr")
+        optimize(make_left_engine(), TEXTS, "Expr", backward=True)
+
+    def test_compiled(self):
+        engine = optimize(make_engine())
+        self.assertTrue(engine.lexer.compiled)
+        self.assertTrue(all(isinstance(token, Optimized_Token) for token in engine.lexer.tokenize("1 + 2")))
+
+        # Atom is inlined in Mul, Term is kept as it ends with itself
+        mul = engine.parser.get_all_matching_builders("Mul")[0]
+        atom, star, term = mul.rule.rules
+        self.assertEqual([rule.identifier for rule in atom.rule.rules], ["Par", "Int"])
+        self.assertEqual([rule.identifier for rule in term.rule.rules], ["Term"])
+        self.assertIsInstance(star, Optimized_Match)
+        self.assertEqual(star.rules, ())
+
+    def test_guards(self):
+        engine = make_engine(packrat=True)
+        optimized = optimize(engine)
+        engine.read("1 + 2 * 3")
+        optimized.read("1 + 2 * 3")
+        self.assertLess(optimized.parser.memo.misses, engine.parser.memo.misses)
+
+    def test_expected(self):
+        def error(engine, text, backward):
+            try:
+                engine.read(text, "Expr", backward=backward, strict=True)
+            except ParseError as e:
+                return e.position, e.expected
+
+        # the alternatives skipped by their guard and the inlined matches expect the same tokens
+        for engine in (make_engine(packrat=True), make_left_engine(packrat=True, fast=True)):
+            optimized = optimize(engine)
+            for text in [text for text in TEXTS if "a" not in text] + ["(1 + )", "1 * * 2", ") 1", "1 (2"]:
+                for backward in (False, True):
+                    with self.subTest(text=text, backward=backward):
+                        self.assertEqual(error(optimized, text, backward), error(engine, text, backward))
+
+    def test_check(self):
+        engine = make_engine()
+        other = make_engine()
+        other.parser.builders.pop()
+        with self.assertRaises(OptimizeError):
+            check(engine, other, ["1"], "Expr")
+
+
+class TestGrammarCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_hit(self):
+        engine = make_engine(packrat=True)
+        first = GrammarCache(self.directory.name)
+        compiled = first.compile(engine)
+        self.assertEqual((first.hits, first.misses), (0, 1))
+
+        second = GrammarCache(self.directory.name)
+        loaded = second.compile(engine)
+        self.assertEqual((second.hits, second.misses), (1, 0))
+        self.assertTrue(loaded.lexer.compiled)
+        self.assertTrue(loaded.parser.packrat)
+
+        for text in TEXTS:
+            self.assertEqual(_read(loaded, text, "Expr", False), _read(compiled, text, "Expr", False))
+
+    def test_hash(self):
+        engine = make_engine()
+        self.assertEqual(grammar_hash(engine), grammar_hash(make_engine(packrat=True)))
+        engine.lexer.add_pattern("SLASH", mode="str", expr="/")
+        self.assertNotEqual(grammar_hash(engine), grammar_hash(make_engine()))
+        self.assertNotEqual(grammar_hash(make_left_engine()), grammar_hash(make_engine()))
+
+    def test_hash_value(self):
+        def make(value):
+            engine = make_engine()
+            engine.lexer.patterns[0].value = value
+            return grammar_hash(engine)
+
+        def convert(content):
+            return int(content)
+
+        first = make(convert)
+        self.assertEqual(make(convert), first)
+
+        def convert(content):
+            return int(content) + 1
+
+        second = make(convert)
+        self.assertNotEqual(second, first)
+
+        def convert(content):
+            return float(content) + 1
+
+        self.assertNotIn(make(convert), (first, second))
+
+    def test_corrupted(self):
+        engine = make_engine()
+        cache = GrammarCache(self.directory.name)
+        path = cache.path(grammar_hash(engine))
+        for data in (b"not a pickle", pickle.dumps(("lexer", "parser")), pickle.dumps((1, 2, 3, 4))):
+            with open(path, mode="wb") as file:
+                file.write(data)
+            self.assertIsNone(cache.load(grammar_hash(engine)))
+            self.assertFalse(os.path.exists(path))
+
+        compiled = cache.compile(engine)
+        self.assertEqual(cache.misses, 1)
+        self.assertTrue(compiled.lexer.compiled)
+
+    def test_unpicklable(self):
+        engine = make_engine()
+        engine.lexer.add_pattern("X", mode="str", expr="x", value=lambda content: 0)
+        cache = GrammarCache(self.directory.name)
+        cache.compile(engine)
+        cache.compile(engine)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
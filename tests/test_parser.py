@@ -0,0 +1,266 @@
+import unittest
+from text_engine import *
+from text_engine.core.Parser import ParseError
+
+
+def make_engine(**config):
+    lexer = Lexer()
+    lexer.add_pattern("INT", mode="re", expr="[0-9]+", value=int)
+    lexer.add_pattern("PLUS", mode="str", expr="+")
+    lexer.add_pattern("MINUS", mode="str", expr="-")
+    lexer.add_pattern("STAR", mode="str", expr="*")
+    lexer.add_pattern("LP", mode="str", expr="(")
+    lexer.add_pattern("RP", mode="str", expr=")")
+    lexer.add_pattern("WHITESPACE", mode="re", expr="[ \t\n]+", ignore=True)
+
+    parser = Parser(**config)
+
+    # right recursive grammar, where all the alternatives of a level share the same prefix
+    parser.add_builder("Add", match("Term in *") & match("PLUS") & match("Expr in *"))
+    parser.add_builder("Sub", match("Term in *") & match("MINUS") & match("Expr in *"))
+    parser.add_routine("Expr", match("Add") | match("Sub") | match("Term"))
+    parser.add_builder("Mul", match("Atom in *") & match("STAR") & match("Term in *"))
+    parser.add_routine("Term", match("Mul") | match("Atom"))
+    parser.add_builder("Par", match("Expr in *").wrapped_by("LP", "RP"))
+    parser.add_builder("Int", match("INT as value"))
+    parser.add_routine("Atom", match("Par") | match("Int"))
+
+    return Engine(lexer, parser)
+
+
+def make_left_engine(**config):
+    engine = make_engine(**config)
+    parser = Parser(**config)
+
+    # left recursive version of the same grammar
+    parser.add_builder("Add", match("Expr in *") & match("PLUS") & match("Term in *"))
+    parser.add_builder("Sub", match("Expr in *") & match("MINUS") & match("Term in *"))
+    parser.add_routine("Expr", match("Add") | match("Sub") | match("Term"))
+    parser.add_builder("Mul", match("Term in *") & match("STAR") & match("Atom in *"))
+    parser.add_routine("Term", match("Mul") | match("Atom"))
+    parser.add_builder("Par", match("Expr in *").wrapped_by("LP", "RP"))
+    parser.add_builder("Int", match("INT as value"))
+    parser.add_routine("Atom", match("Par") | match("Int"))
+
+    return Engine(engine.lexer, parser)
+
+
+class TestPackrat(unittest.TestCase):
+    TEXTS = ["1", "1 + 2", "1 - 2 * 3", "(1 + 2) * (3 - 4) + 5", "((((1))))", "1 * (2 + (3 - 4 * 5)) - 6"]
+
+    def test_same_results(self):
+        plain = make_engine()
+        packrat = make_engine(packrat=True)
+        for text in self.TEXTS:
+            self.assertEqual(plain.read(text, "Expr"), packrat.read(text, "Expr"))
+
+    def test_counters(self):
+        engine = make_engine(packrat=True)
+        engine.read("1 + 2 + 3", "Expr")
+        self.assertGreater(engine.parser.memo.hits, 0)
+        self.assertEqual(engine.parser.memo.misses, len(engine.parser.memo))
+
+    def test_linear(self):
+        engine = make_engine(packrat=True)
+        text = "(" * 20 + "1" + ")" * 20
+        self.assertIsNotNone(engine.read(text, "Expr"))
+        tokens = len(engine.lexer.tokenize(text))
+        self.assertLessEqual(engine.parser.memo.misses, len(engine.parser.builders) * (tokens + 1))
+
+    def test_bounded(self):
+        engine = make_engine(packrat=True, memo_size=8)
+        for text in self.TEXTS:
+            self.assertEqual(make_engine().read(text, "Expr"), engine.read(text, "Expr"))
+            self.assertLessEqual(len(engine.parser.memo), 8)
+        self.assertGreater(engine.parser.memo.evictions, 0)
+
+    def test_engine_option(self):
+        engine = make_engine()
+        self.assertFalse(engine.parser.packrat)
+        engine = Engine(engine.lexer, engine.parser, packrat=True)
+        self.assertTrue(engine.parser.packrat)
+
+
+class TestLeftRecursion(unittest.TestCase):
+    TEXTS = TestPackrat.TEXTS + ["1 - 2 - 3 + 4", "1 * 2 * 3 - 4 * 5 * 6", "(1 - 2 - 3) * 4 * 5"]
+
+    def test_same_as_backward(self):
+        backward = make_left_engine()
+        forward = make_left_engine(packrat=True)
+        for text in self.TEXTS:
+            self.assertEqual(backward.read(text, "Expr", backward=True), forward.read(text, "Expr"))
+
+    def test_left_associative(self):
+        engine = make_left_engine(packrat=True)
+        result = engine.read("1 - 2 - 3", "Expr")
+        self.assertEqual(result["__class__"], "Sub")
+        self.assertEqual(result["*"][0]["__class__"], "Sub")
+        self.assertEqual(result["*"][1], {"__class__": "Int", "value": 3})
+
+    def test_linear(self):
+        engine = make_left_engine(packrat=True)
+        text = " - ".join(["1 * 2"] * 40)
+        self.assertIsNotNone(engine.read(text, "Expr"))
+        tokens = len(engine.lexer.tokenize(text))
+        self.assertLessEqual(engine.parser.memo.misses, len(engine.parser.builders) * (tokens + 1))
+
+
+class TestFastFailures(unittest.TestCase):
+    def test_same_results(self):
+        for config in (dict(), dict(packrat=True)):
+            plain = make_engine(**config)
+            fast = make_engine(fast=True, **config)
+            for text in TestPackrat.TEXTS:
+                self.assertEqual(plain.read(text, "Expr"), fast.read(text, "Expr"))
+
+    def test_left_recursion(self):
+        plain = make_left_engine(packrat=True)
+        fast = make_left_engine(packrat=True, fast=True)
+        for text in TestLeftRecursion.TEXTS:
+            self.assertEqual(plain.read(text, "Expr"), fast.read(text, "Expr"))
+
+    def test_sentinel(self):
+        engine = make_engine(fast=True)
+        results = engine.parser.parse(engine.lexer.tokenize("(1 + )"), 0, "Expr")
+        self.assertIs(next(results), engine.parser.failure)
+        self.assertEqual(engine.parser.furthest, 3)
+
+    def test_explain(self):
+        engine = make_engine(fast=True)
+        result, = engine.explain("(1 + )", "Expr")
+        self.assertIsInstance(result, Result_Error)
+        self.assertIsNot(result, engine.parser.failure)
+        self.assertTrue(engine.parser.fast)
+
+
+class TestParseError(unittest.TestCase):
+    def test_expected(self):
+        for config in (dict(), dict(fast=True), dict(packrat=True, fast=True)):
+            engine = make_engine(**config)
+            with self.assertRaises(ParseError) as context:
+                engine.read("(1 + )", "Expr", strict=True)
+            error = context.exception
+            self.assertEqual(error.position, 3)
+            self.assertEqual(error.expected, {"INT", "LP"})
+            self.assertEqual(error.found_token.content, ")")
+
+    def test_end_of_text(self):
+        engine = make_left_engine(packrat=True, fast=True)
+        with self.assertRaises(ParseError) as context:
+            engine.read("(1", "Expr", strict=True)
+        self.assertEqual(context.exception.expected, {"PLUS", "MINUS", "STAR", "RP"})
+        self.assertIsNone(context.exception.found_token)
+
+    def test_success(self):
+        engine = make_engine(fast=True)
+        self.assertIsNotNone(engine.read("1 + 2", "Expr", strict=True))
+        self.assertIsNone(engine.read("1 2", "Expr"))
+
+
+class TestIterative(unittest.TestCase):
+    TEXTS = TestPackrat.TEXTS + ["(1 + )", "1 2", ""]
+
+    def test_same_results(self):
+        for config in (dict(), dict(fast=True), dict(packrat=True), dict(packrat=True, fast=True)):
+            recursive = make_engine(**config)
+            iterative = make_engine(iterative=True, **config)
+            for text in self.TEXTS:
+                self.assertEqual(recursive.read(text, "Expr"), iterative.read(text, "Expr"))
+                self.assertEqual(recursive.parser.furthest, iterative.parser.furthest)
+                self.assertEqual(recursive.parser.expected, iterative.parser.expected)
+
+    def test_left_recursion(self):
+        for backward in (False, True):
+            recursive = make_left_engine(packrat=True)
+            iterative = make_left_engine(packrat=True, iterative=True)
+            for text in TestLeftRecursion.TEXTS:
+                self.assertEqual(
+                    recursive.read(text, "Expr", backward=backward),
+                    iterative.read(text, "Expr", backward=backward)
+                )
+
+    def test_deep(self):
+        text = "(" * 1000 + "1" + ")" * 1000
+        with self.assertRaises(RecursionError):
+            make_engine(packrat=True, fast=True).read(text, "Expr")
+        for config in (dict(packrat=True), dict(packrat=True, fast=True)):
+            ast = make_engine(iterative=True, **config).read(text, "Expr")
+            for _ in range(1000):
+                ast, = ast["*"]
+            self.assertEqual(ast, {"__class__": "Int", "value": 1})
+
+
+class TestProfiler(unittest.TestCase):
+    TEXT = "1 * (2 + 3) - 4 * 5 + (6 - 7)"
+
+    def profile(self, engine):
+        with Profiler(engine.parser) as profiler:
+            self.assertIsNotNone(engine.read(self.TEXT, "Expr"))
+        return profiler
+
+    def test_stats(self):
+        profiler = self.profile(make_engine(packrat=True))
+        counts = {identifier: (stats.calls, stats.successes) for identifier, stats in profiler.stats.items()}
+        self.assertEqual(counts["Int"], (7, 7))
+        self.assertEqual(counts["Par"][1], 2)
+        self.assertGreater(profiler.stats["Mul"].backtracks, 0)
+        for stats in profiler.stats.values():
+            self.assertLessEqual(stats.self_time, stats.cumulative + 1e-9)
+
+        iterative = self.profile(make_engine(packrat=True, iterative=True))
+        self.assertEqual(
+            {identifier: (stats.calls, stats.successes, stats.backtracks) for identifier, stats in profiler.stats.items()},
+            {identifier: (stats.calls, stats.successes, stats.backtracks) for identifier, stats in iterative.stats.items()}
+        )
+
+    def test_collapsed(self):
+        profiler = self.profile(make_left_engine(packrat=True))
+        lines = list(profiler.collapsed())
+        self.assertIn("Expr", [line.split(" ")[0] for line in lines])
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            self.assertTrue(stack.startswith("Expr"))
+            self.assertGreaterEqual(int(count), 0)
+
+    def test_disabled(self):
+        engine = make_engine()
+        self.profile(engine)
+        self.assertNotIn("apply", engine.parser.__dict__)
+        self.assertNotIn("apply_steps", engine.parser.__dict__)
+
+
+class TestIdentified(unittest.TestCase):
+    def test_operators(self):
+        pattern = Pattern("PLUS.SYMBOL.MATHS", mode="str", expr="+")
+        self.assertTrue(pattern <= "PLUS")
+        self.assertTrue(pattern <= "*.SYMBOL")
+        self.assertTrue(pattern <= "PLUS.MATHS.SYMBOL")
+        self.assertFalse(pattern <= "MINUS")
+        self.assertFalse(pattern <= "PLUS.OTHER")
+        self.assertTrue(Match("*.SYMBOL") >= pattern)
+        self.assertFalse(Match("PLUS.OTHER") >= pattern)
+        self.assertEqual(Match("A.x.y"), Match("A.y.x"))
+        self.assertIs(Match("A.x.y").key, Identified.intern("A.x.y"))
+
+    def test_lookup(self):
+        engine = make_engine()
+        builders = engine.parser.get_all_matching_builders("Expr")
+        self.assertEqual([builder.identifier for builder in builders], ["Expr"])
+        self.assertIs(engine.parser.get_all_matching_builders("Expr"), builders)
+        engine.parser.add_routine("Expr", match("Int"))
+        self.assertEqual(len(engine.parser.get_all_matching_builders("Expr")), 2)
+
+        # the builders replaced in place
+        index = next(index for index, builder in enumerate(engine.parser.builders) if builder.identifier == "Int")
+        replacement = Builder("Int", match("INT as value"))
+        self.assertIsNot(engine.parser.get_all_matching_builders("Int")[0], replacement)
+        engine.parser.builders[index] = replacement
+        (builder,) = engine.parser.get_all_matching_builders("Int")
+        self.assertIs(builder, replacement)
+
+        engine.parser.builders = [replacement]
+        self.assertEqual(engine.parser.get_all_matching_builders("Expr"), ())
+
+
+if __name__ == '__main__':
+    unittest.main()
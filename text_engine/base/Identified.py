@@ -1,24 +1,57 @@
 class Identified:
+    """
+        Object named by an identifier "NAME.group1.group2", the identifier is interned once as
+        ``key`` = (name id, groups bitset) so the matching operators only compare integers
+    """
     identifier: str
     ALL = "*"
     SEP = "."
 
+    NAMES = {ALL: 0}
+    GROUPS = {}
+    KEYS = {}
+
     def __init__(self, identifier: str):
         self.identifier = identifier
         self.name, *self.groups = identifier.split(self.SEP)
+        self.key = self.intern(identifier)
+
+    @classmethod
+    def intern(cls, identifier: str):
+        """The (name id, groups bitset) of ``identifier``, computed once per distinct identifier"""
+        key = cls.KEYS.get(identifier)
+        if key is None:
+            name, *groups = identifier.split(cls.SEP)
+            name_id = cls.NAMES.setdefault(name, len(cls.NAMES))
+            mask = 0
+            for group in groups:
+                mask |= 1 << cls.GROUPS.setdefault(group, len(cls.GROUPS))
+            key = cls.KEYS[identifier] = (name_id, mask)
+        return key
+
+    @classmethod
+    def key_of(cls, identifier):
+        if isinstance(identifier, Identified):
+            return identifier.key
+        return cls.intern(identifier)
+
+    def __getstate__(self):
+        # the interned ids are only valid in the current process
+        state = dict(self.__dict__)
+        del state["key"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.key = self.intern(self.identifier)
 
     def __eq__(self, identified):
-        name, *groups = identified.identifier.split(self.SEP)
-        return name == self.name and set(groups) == set(self.groups)
+        return self.key == identified.key
 
     def __le__(self, identifier: str):
-        if isinstance(identifier, Identified):
-            identifier = identifier.identifier
-        name, *groups = identifier.split(self.SEP)
-        return name in (self.ALL, self.name) and all(group in self.groups for group in groups)
+        name_id, mask = self.key_of(identifier)
+        return (name_id == 0 or name_id == self.key[0]) and not mask & ~self.key[1]
 
     def __ge__(self, identifier: str):
-        if isinstance(identifier, Identified):
-            identifier = identifier.identifier
-        name, *groups = identifier.split(self.SEP)
-        return self.name in (self.ALL, name) and all(group in groups for group in self.groups)
+        name_id, mask = self.key_of(identifier)
+        return (self.key[0] == 0 or self.key[0] == name_id) and not self.key[1] & ~mask
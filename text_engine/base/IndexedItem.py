@@ -1,4 +1,5 @@
 class IndexedItem:
+    __slots__ = ()
     at_index: int
     to_index: int
 
@@ -1,4 +1,5 @@
 class LayeredItem:
+    __slots__ = ()
     layer: int
 
     def __init__(self, layer: int):
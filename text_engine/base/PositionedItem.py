@@ -1,4 +1,6 @@
 class PositionedItem:
+    # the slots are declared by the subclasses, so that they can mix several items
+    __slots__ = ()
     at_position: int
     to_position: int
 
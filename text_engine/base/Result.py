@@ -5,11 +5,13 @@ from .Context import Context
 
 
 class Result(PositionedItem, LayeredItem):
+    __slots__ = ("at_position", "to_position", "layer", "rule")
     rule: Rule
 
     def __init__(self, rule: Rule, at_position: int, to_position: int, layer: int = 0):
-        PositionedItem.__init__(self, at_position, to_position)
-        LayeredItem.__init__(self, layer)
+        self.at_position = at_position
+        self.to_position = to_position
+        self.layer = layer
         self.rule = rule
 
     def __str__(self):
@@ -17,3 +19,11 @@ class Result(PositionedItem, LayeredItem):
 
     def build(self, context: Context):
         raise NotImplementedError
+
+    def build_ast(self, astb, pile: list, data: dict):
+        """Same as ``build`` without Context, the builder results are directly made by ``astb`` (if not None)"""
+        raise NotImplementedError
+
+    def build_steps(self, astb, pile: list, data: dict):
+        """Version of ``build_ast`` for the iterative mode (see Parser.run), by default ``build_ast``"""
+        return self.build_ast(astb, pile, data)
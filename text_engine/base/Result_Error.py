@@ -4,6 +4,8 @@ from .Context import Context
 
 
 class Result_Error(Result):
+    __slots__ = ("reason", "result")
+
     def __init__(self, rule: Rule, at_position: int, reason="", result=None):
         to_position = at_position if result is None else result.to_position
         layer = 0 if result is None else result.layer + 1
@@ -26,3 +28,6 @@ class Result_Error(Result):
 
     def build(self, context: Context):
         pass
+
+    def build_ast(self, astb, pile: list, data: dict):
+        pass
@@ -5,6 +5,7 @@ from .Context import Context
 
 
 class Result_List(Result):
+    __slots__ = ("results",)
     results: List[Result]
 
     def __init__(self, rule: Rule, at_position: int):
@@ -29,3 +30,11 @@ class Result_List(Result):
     def build(self, context: Context):
         for result in self.results:
             result.build(context)
+
+    def build_ast(self, astb, pile: list, data: dict):
+        for result in self.results:
+            result.build_ast(astb, pile, data)
+
+    def build_steps(self, astb, pile: list, data: dict):
+        for result in self.results:
+            yield result.build_steps(astb, pile, data)
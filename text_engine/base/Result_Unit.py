@@ -4,6 +4,7 @@ from .Context import Context
 
 
 class Result_Unit(Result):
+    __slots__ = ("result",)
     result: Result
 
     def __init__(self, rule: Rule, result: Result):
@@ -19,3 +20,9 @@ class Result_Unit(Result):
 
     def build(self, context: Context):
         self.result.build(context)
+
+    def build_ast(self, astb, pile: list, data: dict):
+        self.result.build_ast(astb, pile, data)
+
+    def build_steps(self, astb, pile: list, data: dict):
+        yield self.result.build_steps(astb, pile, data)
@@ -1,5 +1,14 @@
 class Rule:
     def parse(self, tokens: list, position: int, parser, backward: bool = False):
+        """The result of the rule at ``position``, its ``parse_steps`` are driven by the parser (see Parser.drive)"""
+        return parser.drive(self.parse_steps(tokens, position, parser, backward))
+
+    def parse_steps(self, tokens: list, position: int, parser, backward: bool = False):
+        """
+            A generator which parses the sub rules by yielding their own steps (their result is sent back,
+            see Parser.run) and returns the result of the rule, or directly the result when it doesn't depend
+            on other rules
+        """
         raise NotImplementedError
 
     def __and__(self, other):
@@ -12,5 +12,5 @@ class Rule_Unit(Rule):
                "\n".join(f"  {line}" for line in str(self.rule).split("\n")) + \
                "\n]"
 
-    def parse(self, tokens: list, position: int, parser, backward: bool = False):
+    def parse_steps(self, tokens: list, position: int, parser, backward: bool = False):
         raise NotImplementedError
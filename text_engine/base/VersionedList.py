@@ -0,0 +1,27 @@
+class VersionedList(list):
+    """List whose ``version`` changes with each modification, so the caches built from it know when to be rebuilt"""
+    # also the version of the unpickled lists, whose items are appended before their state is restored
+    version = 0
+
+    def _changed(method):
+        def wrapper(self, *args):
+            self.version += 1
+            return method(self, *args)
+
+        wrapper.__name__ = method.__name__
+        return wrapper
+
+    __setitem__ = _changed(list.__setitem__)
+    __delitem__ = _changed(list.__delitem__)
+    __iadd__ = _changed(list.__iadd__)
+    __imul__ = _changed(list.__imul__)
+    append = _changed(list.append)
+    extend = _changed(list.extend)
+    insert = _changed(list.insert)
+    pop = _changed(list.pop)
+    remove = _changed(list.remove)
+    clear = _changed(list.clear)
+    sort = _changed(list.sort)
+    reverse = _changed(list.reverse)
+
+    del _changed
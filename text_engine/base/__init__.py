@@ -1,4 +1,5 @@
 from .Identified import Identified
+from .VersionedList import VersionedList
 
 from .PositionedItem import PositionedItem
 from .PositionedPart import PositionedPart
@@ -4,11 +4,22 @@ class ASTB:
         give it the classes you want to use when building the ast
         then, call the instance with the ast as argument
         if the ast is a valid one, it will return the corresponding nested object
+        (Engine.read doesn't build the ast dicts, the objects are made directly from the results with ``make``)
     """
 
     def __init__(self, *classes):
         self.classes = dict((cls.__name__, cls) for cls in classes)
 
+    @staticmethod
+    def make(cls, data: dict):
+        """The ``cls`` object of the (already built) ``data`` of a builder result"""
+        if "*" in data:
+            args = data.pop("*")
+            if not isinstance(args, list):
+                args = [args]
+            return cls(*args, **data)
+        return cls(**data)
+
     def __call__(self, ast):
         if isinstance(ast, dict):
             cls = self.classes.get(ast.get("__class__"))
@@ -1,16 +1,19 @@
-from ..base import Rule_List, Result_List
+from ..base import Rule, Rule_List, Result, Result_List
 from .Parser import Parser
 
 
 class All(Rule_List):
-    def parse(self, tokens: list, position: int, parser: Parser, backward: bool = False):
+    def parse_steps(self, tokens: list, position: int, parser: Parser, backward: bool = False):
         rules = reversed(self.rules) if backward else self.rules
 
         results = AllResult(rule=self, at_position=position)
 
         for rule in rules:
             r_position = results.at_position if backward else results.to_position
-            result = rule.parse(tokens, r_position, parser, backward)
+            result = yield rule.parse_steps(tokens, r_position, parser, backward)
+
+            if not result and parser.fast:
+                return result
 
             results.append(result, backward)
 
@@ -21,8 +24,19 @@ class All(Rule_List):
 
 
 class AllResult(Result_List):
+    __slots__ = ("valid",)
+
+    def __init__(self, rule: Rule, at_position: int):
+        super().__init__(rule, at_position)
+        self.valid = True
+
+    def append(self, result: Result, backward: bool = False):
+        super().append(result, backward)
+        if not result:
+            self.valid = False
+
     def __bool__(self):
-        return all(map(bool, self.results))
+        return self.valid
 
     def __str__(self):
         return super().__str__() + self.__str_body__()
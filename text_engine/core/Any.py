@@ -3,14 +3,22 @@ from .Parser import Parser
 
 
 class Any(Rule_List):
-    def parse(self, tokens: list, position: int, parser: Parser, backward: bool = False):
+    def parse_steps(self, tokens: list, position: int, parser: Parser, backward: bool = False):
+        if parser.fast:
+            for rule in self.rules:
+                result = yield rule.parse_steps(tokens, position, parser, backward)
+                if result:
+                    return AnyResult(rule=self, result=result)
+            return parser.failure
+
         errors = Result_List(rule=self, at_position=position)
         for rule in self.rules:
-            result = rule.parse(tokens, position, parser, backward)
+            result = yield rule.parse_steps(tokens, position, parser, backward)
             if result:
                 return AnyResult(rule=self, result=result)
             else:
-                errors.append(result)
+                # failing alternatives all start at ``position``, they are not a sequence
+                errors.results.append(result)
 
         return Result_Error(
             rule=self,
@@ -21,5 +29,7 @@ class Any(Rule_List):
 
 
 class AnyResult(Result_Unit):
+    __slots__ = ()
+
     def __str__(self):
         return super().__str__() + self.__str_body__()
@@ -14,10 +14,12 @@ class As(Rule_Unit):
                "\n".join(f"  {line}" for line in str(self.rule).split("\n")) + \
                "\n]"
 
-    def parse(self, tokens: list, position: int, parser: Parser, backward: bool = False):
-        result = self.rule.parse(tokens, position, parser, backward)
+    def parse_steps(self, tokens: list, position: int, parser: Parser, backward: bool = False):
+        result = yield self.rule.parse_steps(tokens, position, parser, backward)
         if result:
             return AsResult(rule=self, result=result)
+        elif parser.fast:
+            return result
         else:
             return Result_Error(
                 rule=self,
@@ -28,6 +30,7 @@ class As(Rule_Unit):
 
 
 class AsResult(Result_Unit):
+    __slots__ = ()
     rule: As
 
     def __str__(self):
@@ -36,3 +39,11 @@ class AsResult(Result_Unit):
     def build(self, context: Context):
         super().build(context)
         context.key_set(self.rule.key, context.pop_last())
+
+    def build_ast(self, astb, pile: list, data: dict):
+        self.result.build_ast(astb, pile, data)
+        data[self.rule.key] = pile.pop()
+
+    def build_steps(self, astb, pile: list, data: dict):
+        yield self.result.build_steps(astb, pile, data)
+        data[self.rule.key] = pile.pop()
@@ -3,10 +3,12 @@ from .Parser import Parser
 
 
 class Builder(Rule_Main):
-    def parse(self, tokens: list, position: int, parser: Parser, backward: bool = False):
-        result = self.rule.parse(tokens, position, parser, backward)
+    def parse_steps(self, tokens: list, position: int, parser: Parser, backward: bool = False):
+        result = yield self.rule.parse_steps(tokens, position, parser, backward)
         if result:
             return BuilderResult(rule=self, result=result)
+        elif parser.fast:
+            return result
         else:
             return Result_Error(
                 rule=self,
@@ -17,6 +19,7 @@ class Builder(Rule_Main):
 
 
 class BuilderResult(Result_Unit):
+    __slots__ = ()
     rule: Builder
 
     def __str__(self):
@@ -26,3 +29,15 @@ class BuilderResult(Result_Unit):
         sub_context = context.sub_context(__class__=self.rule.name)
         super().build(sub_context)
         context.add_item(sub_context.data)
+
+    def build_ast(self, astb, pile: list, data: dict):
+        cls = None if astb is None else astb.classes.get(self.rule.name)
+        sub_data = {} if cls else {"__class__": self.rule.name}
+        self.result.build_ast(astb, [], sub_data)
+        pile.append(astb.make(cls, sub_data) if cls else sub_data)
+
+    def build_steps(self, astb, pile: list, data: dict):
+        cls = None if astb is None else astb.classes.get(self.rule.name)
+        sub_data = {} if cls else {"__class__": self.rule.name}
+        yield self.result.build_steps(astb, [], sub_data)
+        pile.append(astb.make(cls, sub_data) if cls else sub_data)
@@ -1,6 +1,11 @@
+import os
+import pickle
+from multiprocessing import Pool
 from .Lexer import Lexer, TokenizeError
-from .Parser import Parser
+from .Parser import Parser, ParseError
 from .ASTB import ASTB
+from .TokenWindow import TokenWindow
+from .Forest import Forest
 from ..base import Identified, Context
 
 
@@ -12,6 +17,19 @@ class InvalidASTError(Exception):
     pass
 
 
+class EngineReadError(Exception):
+    """Failure of one of the texts of Engine.read_many, returned in place of its ast"""
+
+    def __init__(self, index: int, error_type: str, message: str):
+        super().__init__(index, error_type, message)
+        self.index = index
+        self.error_type = error_type
+        self.message = message
+
+    def __str__(self):
+        return f"text {self.index}: {self.error_type}: {self.message}"
+
+
 class EngineTokenizeError(Exception):
     def __init__(self, tokens, tokenize_error=None):
         self.tokens = tokens
@@ -24,16 +42,46 @@ class EngineTokenizeError(Exception):
         ) + ("\n\n" + str(self.tokenize_error) if self.tokenize_error else "")
 
 
+_worker_engine = None
+
+
+def _init_worker(data: bytes):
+    global _worker_engine
+    _worker_engine = pickle.loads(data)
+
+
+def _read_item(engine, item, identifier, backward):
+    index, text = item
+    try:
+        return index, engine.read(text, identifier, backward=backward)
+    except Exception as e:
+        return index, EngineReadError(index, e.__class__.__name__, str(e))
+
+
+def _read_worker_item(args):
+    return _read_item(_worker_engine, *args)
+
+
 class Engine:
     lexer: Lexer
     parser: Parser
     astb: ASTB
 
-    def __init__(self, lexer: Lexer, parser: Parser, astb: ASTB = None):
+    def __init__(self, lexer: Lexer, parser: Parser, astb: ASTB = None, packrat: bool = None, fast: bool = None,
+                 iterative: bool = None):
         self.lexer = lexer
         self.parser = parser
         self.astb = astb
 
+        if packrat is not None:
+            self.parser.packrat = packrat
+
+        if fast is not None:
+            self.parser.fast = fast
+
+        if iterative is not None:
+            self.parser.iterative = iterative
+
     def _make_tokens(self, text, index: int = 0):
         tokens = []
         try:
@@ -69,17 +117,104 @@ class Engine:
         for result in self.results(text, identifier, index, backward):
             return result
 
-    def read(self, text: str, identifier: str = Identified.ALL, index: int = 0, backward=False):
+    def explain(self, text: str, identifier: str = Identified.ALL, index: int = 0, backward=False):
+        """The results of the builders matching ``identifier``, with the detailed errors of the failing ones"""
+        tokens = self._make_tokens(text, index)
+        start_position = len(tokens) if backward else 0
+        return self.parser.explain(tokens, start_position, identifier, backward)
+
+    def read(self, text: str, identifier: str = Identified.ALL, index: int = 0, backward=False, strict=False):
+        """The ast of ``text``, None if it can't be read or a ParseError is raised when ``strict``"""
         tokens = self._make_tokens(text, index)
         results = self._make_results(tokens, identifier, backward)
-        contexts = self._make_contexts(results)
-        for context in contexts:
-            ast = context.pile[-1]
+        for ast in self._make_asts(results):
+            return ast
+        if strict:
+            raise self.parser.error(tokens)
+
+    def forest(self, text: str, identifier: str = Identified.ALL, index: int = 0, backward=False):
+        """The Forest of all the ways ``text`` can be read, the alternatives of the grammar being all kept"""
+        return Forest(self.parser, self._make_tokens(text, index), identifier, backward)
+
+    def read_all(self, text: str, identifier: str = Identified.ALL, index: int = 0, backward=False):
+        """The asts of all the parses of ``text`` (see Forest), made lazily"""
+        return self._make_asts(self.forest(text, identifier, index, backward).trees())
 
-            if ast:
-                if self.astb is None:
-                    return ast
+    def _make_asts(self, results):
+        """The asts of ``results``, the objects of ``astb`` are made in one pass over the results (see ASTB)"""
+        for result in results:
+            pile = []
+            try:
+                if self.parser.iterative:
+                    self.parser.run(result.build_steps(self.astb, pile, {}))
                 else:
-                    return self.astb(ast)
+                    result.build_ast(self.astb, pile, {})
+            except BuildResultError:
+                continue
+
+            ast = pile[-1]
+            # the objects made by the astb are valid even if they are falsy, as their ast dicts are not
+            if ast or self.astb is not None and ast.__class__.__name__ in self.astb.classes:
+                yield ast
             else:
                 raise InvalidASTError
+
+    def _read_window(self, tokens: TokenWindow, identifier: str = Identified.ALL):
+        position = 0
+        while not tokens.at_end(position):
+            for result in self.parser.parse(tokens, position, identifier):
+                if result and result.to_position > position:
+                    break
+            else:
+                raise self.parser.error(tokens)
+
+            yield from self._make_asts([result])
+
+            position = result.to_position
+            tokens.discard(position)
+
+        self.parser.reset()
+
+    def i_read(self, text: str, identifier: str = Identified.ALL, index: int = 0):
+        """
+            Read ``text`` as a sequence of ``identifier`` and yield their asts one at a time (forward only)
+            the tokens are pulled lazily into a TokenWindow and dropped once the item using them is read,
+            so the memory used is bounded by the size of the items rather than the size of the text
+        """
+        tokens = TokenWindow(self.lexer.i_tokenize(text, index, 0))
+        try:
+            yield from self._read_window(tokens, identifier)
+        except TokenizeError as e:
+            raise EngineTokenizeError(list(tokens.buffer), e)
+
+    def read_many(self, texts, identifier: str = Identified.ALL, backward=False, workers: int = None,
+                  chunksize: int = 1, ordered: bool = True):
+        """
+            Read each of ``texts`` in ``workers`` processes (all the cpus by default, in this process if 0 or 1)
+            the engine is pickled once for each worker, so its grammar (patterns values, ast classes)
+            has to be picklable
+            when ``ordered`` the asts are yielded in the order of ``texts``, else (index, ast) pairs are
+            yielded as soon as they are read
+            a text whose reading raises an exception gives an EngineReadError instead of its ast
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        items = ((item, identifier, backward) for item in enumerate(texts))
+
+        if workers <= 1:
+            results = (_read_item(self, *args) for args in items)
+            if ordered:
+                for index, ast in results:
+                    yield ast
+            else:
+                yield from results
+            return
+
+        self.parser.reset()
+        with Pool(workers, initializer=_init_worker, initargs=(pickle.dumps(self),)) as pool:
+            if ordered:
+                for index, ast in pool.imap(_read_worker_item, items, chunksize):
+                    yield ast
+            else:
+                yield from pool.imap_unordered(_read_worker_item, items, chunksize)
@@ -0,0 +1,442 @@
+from math import inf
+from ..base import Identified, Rule, Rule_Main
+from .Match import Match, MatchResult
+from .Builder import Builder, BuilderResult
+from .Routine import RoutineResult
+from .As import As, AsResult
+from .In import In, InResult
+from .All import All, AllResult
+from .Any import Any, AnyResult
+from .Optional import Optional, OptionalResult
+from .Repeat import Repeat, RepeatResult
+
+EMPTY = {}
+
+
+class Semiring:
+    """How the derivations of the forest are combined : ``plus`` between alternatives, ``times`` along sequences"""
+
+    def __init__(self, zero, one, plus, times, node, cycle):
+        self.zero = zero
+        self.one = one
+        self.plus = plus
+        self.times = times
+        # the value of a builder from the value of its rule
+        self.node = node
+        # the value of a derivation going through itself
+        self.cycle = cycle
+
+
+COUNT = Semiring(zero=0, one=1, plus=lambda a, b: a + b, times=lambda a, b: a * b if a and b else 0,
+                 node=lambda builder, value: value, cycle=inf)
+
+
+class Forest:
+    """
+        Shared packed parse forest of every way the builders matching ``identifier`` can read all the ``tokens``
+        the rules are read as a context free grammar : all the alternatives of an Any and all the builders of a Match
+        are kept (not only the first which succeeds), Repeat and Optional match any number of times
+        a node is a builder over a span of tokens, shared by all the parses using it, its alternatives are only
+        expanded when the forest is counted or its trees are extracted
+        the ends of the builders at a position are memoized, the left recursions are grown to their fixpoint
+    """
+
+    def __init__(self, parser, tokens: list, identifier: str = Identified.ALL, backward: bool = False):
+        self.parser = parser
+        self.tokens = tokens
+        self.identifier = identifier
+        self.backward = backward
+        self.start = len(tokens) if backward else 0
+        self.end = 0 if backward else len(tokens)
+
+        # (builder id, position) -> ends
+        self.done = {}
+        # the ends of the builders being computed, and of the ones depending on them (with the lowest depth they use)
+        self.approx = {}
+        self.tentative = {}
+        self.tentative_keys = []
+        self.depths = {}
+        self.lows = []
+        self.updates = 0
+        self.values = {}
+
+        self.roots = [
+            builder for builder in parser.get_all_matching_builders(identifier)
+            if self.end in self.builder_ends(builder, self.start)
+        ]
+
+    def __bool__(self):
+        return bool(self.roots)
+
+    def ends(self, rule: Rule, position: int):
+        """The positions where ``rule`` can end when it starts at ``position``, in the order of the alternatives"""
+        if isinstance(rule, Rule_Main):
+            return self.builder_ends(rule, position)
+        elif isinstance(rule, Match):
+            token = self.get_token(position)
+            if token is None:
+                return EMPTY
+            if token.pattern <= rule:
+                return {self.next(position): None}
+            ends = {}
+            for builder in self.parser.get_all_matching_builders(rule):
+                ends.update(self.builder_ends(builder, position))
+            return ends
+        elif isinstance(rule, (As, In)):
+            return self.ends(rule.rule, position)
+        elif isinstance(rule, Any):
+            ends = {}
+            for sub_rule in rule.rules:
+                ends.update(self.ends(sub_rule, position))
+            return ends
+        elif isinstance(rule, All):
+            ends = {position: None}
+            for sub_rule in self.sequence(rule):
+                ends = {end: None for middle in ends for end in self.ends(sub_rule, middle)}
+                if not ends:
+                    break
+            return ends
+        elif isinstance(rule, Optional):
+            return {**self.ends(rule.rule, position), position: None}
+        elif isinstance(rule, Repeat):
+            reached = {position: None}
+            frontier = [position]
+            while frontier:
+                middle = frontier.pop(0)
+                for end in self.ends(rule.rule, middle):
+                    if end not in reached:
+                        reached[end] = None
+                        frontier.append(end)
+            # the longest repetitions first, as the parser does
+            return dict.fromkeys(reversed(reached))
+        else:
+            raise TypeError(rule)
+
+    def builder_ends(self, builder: Rule_Main, position: int):
+        key = (id(builder), position)
+        ends = self.done.get(key)
+        if ends is not None:
+            return ends
+
+        depth = self.depths.get(key)
+        if depth is not None:
+            # left recursion : its current approximation, every builder computed since depends on it
+            self.lows[-1] = min(self.lows[-1], depth)
+            return self.approx.get(key, EMPTY)
+
+        tentative = self.tentative.get(key)
+        if tentative is not None:
+            ends, low = tentative
+            self.lows[-1] = min(self.lows[-1], low)
+            return ends
+
+        depth = self.depths[key] = len(self.lows)
+        mark = len(self.tentative_keys)
+        while True:
+            updates = self.updates
+            self.lows.append(inf)
+            ends = self.ends(builder.rule, position)
+            low = self.lows.pop()
+
+            if ends != self.approx.get(key, EMPTY):
+                self.approx[key] = ends
+                self.updates += 1
+
+            # the head of a left recursion is computed again until none of the approximations grow
+            if low == depth and self.updates != updates:
+                self._drop_tentative(mark)
+                continue
+            break
+
+        del self.depths[key]
+        if low < depth:
+            # depends on a builder still being computed
+            self.tentative[key] = ends, low
+            self.tentative_keys.append(key)
+            self.lows[-1] = min(self.lows[-1], low)
+        else:
+            self.approx.pop(key, None)
+            self.done[key] = ends
+            self._settle(mark, depth)
+        return ends
+
+    def _drop_tentative(self, mark: int):
+        # their approximations are kept, to know if they still grow when they are computed again
+        for key in self.tentative_keys[mark:]:
+            del self.tentative[key]
+        del self.tentative_keys[mark:]
+
+    def _settle(self, mark: int, depth: int):
+        """The tentative ends computed within a finished builder are final, unless they depend on an outer one"""
+        kept = []
+        for key in self.tentative_keys[mark:]:
+            ends, low = self.tentative[key]
+            if low < depth:
+                kept.append(key)
+            else:
+                del self.tentative[key]
+                self.approx.pop(key, None)
+                self.done[key] = ends
+        self.tentative_keys[mark:] = kept
+
+    def get_token(self, position: int):
+        return Match.get_token(self.tokens, position - 1 if self.backward else position)
+
+    def next(self, position: int):
+        return position - 1 if self.backward else position + 1
+
+    def before(self, position: int, end: int):
+        """True if ``position`` is between the start of the parse and ``end``"""
+        return end <= position if self.backward else position <= end
+
+    def sequence(self, rule: All):
+        return list(reversed(rule.rules)) if self.backward else rule.rules
+
+    def evaluate(self, semiring: Semiring, rule: Rule = None, start: int = None, end: int = None):
+        """The value of the derivations of ``rule`` over the span (by default, of the whole forest)"""
+        if rule is None:
+            value = semiring.zero
+            for builder in self.roots:
+                value = semiring.plus(value, self.evaluate(semiring, builder, self.start, self.end))
+            return value
+
+        values = self.values.setdefault(semiring, {})
+        plus, times = semiring.plus, semiring.times
+
+        if isinstance(rule, Rule_Main):
+            if end not in self.builder_ends(rule, start):
+                return semiring.zero
+            key = (id(rule), start, end)
+            value = values.get(key, values)
+            if value is None:
+                return semiring.cycle
+            if value is values:
+                values[key] = None
+                value = values[key] = semiring.node(rule, self.evaluate(semiring, rule.rule, start, end))
+            return value
+        elif isinstance(rule, Match):
+            token = self.get_token(start)
+            if token is None:
+                return semiring.zero
+            if token.pattern <= rule:
+                return semiring.one if end == self.next(start) else semiring.zero
+            value = semiring.zero
+            for builder in self.parser.get_all_matching_builders(rule):
+                value = plus(value, self.evaluate(semiring, builder, start, end))
+            return value
+        elif isinstance(rule, (As, In)):
+            return self.evaluate(semiring, rule.rule, start, end)
+        elif isinstance(rule, Any):
+            value = semiring.zero
+            for sub_rule in rule.rules:
+                value = plus(value, self.evaluate(semiring, sub_rule, start, end))
+            return value
+        elif isinstance(rule, All):
+            return self._evaluate_sequence(semiring, values, rule, 0, start, end)
+        elif isinstance(rule, Optional):
+            value = self.evaluate(semiring, rule.rule, start, end)
+            return plus(value, semiring.one) if start == end else value
+        elif isinstance(rule, Repeat):
+            return self._evaluate_repeat(semiring, values, rule, start, end)
+        else:
+            raise TypeError(rule)
+
+    def _evaluate_sequence(self, semiring: Semiring, values: dict, rule: All, index: int, start: int, end: int):
+        rules = self.sequence(rule)
+        if index == len(rules):
+            return semiring.one if start == end else semiring.zero
+
+        key = (id(rule), index, start, end)
+        value = values.get(key)
+        if value is None:
+            value = semiring.zero
+            for middle in self.ends(rules[index], start):
+                if self.before(middle, end):
+                    tail = self._evaluate_sequence(semiring, values, rule, index + 1, middle, end)
+                    if tail != semiring.zero:
+                        value = semiring.plus(value, semiring.times(self.evaluate(semiring, rules[index], start, middle), tail))
+            values[key] = value
+        return value
+
+    def _evaluate_repeat(self, semiring: Semiring, values: dict, rule: Repeat, start: int, end: int):
+        key = (id(rule), start, end)
+        value = values.get(key)
+        if value is None:
+            value = semiring.one if start == end else semiring.zero
+            for middle in self.ends(rule.rule, start):
+                # the empty repetitions are not counted, they would repeat forever
+                if middle != start and self.before(middle, end):
+                    tail = self._evaluate_repeat(semiring, values, rule, middle, end)
+                    if tail != semiring.zero:
+                        value = semiring.plus(value, semiring.times(self.evaluate(semiring, rule.rule, start, middle), tail))
+            values[key] = value
+        return value
+
+    def count(self):
+        """The number of parses (inf when a builder can derive itself over the same span)"""
+        return self.evaluate(COUNT)
+
+    def trees(self):
+        """The results of all the parses, built lazily in the order of the alternatives of the grammar"""
+        for builder in self.roots:
+            yield from self.rule_trees(builder, self.start, self.end, frozenset())
+
+    def first(self):
+        """The first tree of ``trees``, None if the forest is empty"""
+        for tree in self.trees():
+            return tree
+
+    def best(self, weight):
+        """The tree whose sum of the ``weight`` of its builders is the highest (the first one on ties)"""
+        semiring = Semiring(zero=-inf, one=0, plus=max, times=lambda a, b: a + b,
+                            node=lambda builder, value: value + weight(builder), cycle=-inf)
+        try:
+            best = self.evaluate(semiring)
+            for builder in self.roots:
+                if best != -inf and self.evaluate(semiring, builder, self.start, self.end) == best:
+                    return self._best_tree(semiring, builder, self.start, self.end, frozenset())
+        finally:
+            del self.values[semiring]
+
+    def _wrap(self, rule: Rule, result):
+        if isinstance(rule, Rule_Main):
+            return (BuilderResult if isinstance(rule, Builder) else RoutineResult)(rule=rule, result=result)
+        elif isinstance(rule, As):
+            return AsResult(rule=rule, result=result)
+        elif isinstance(rule, In):
+            return InResult(rule=rule, result=result)
+        else:
+            return AnyResult(rule=rule, result=result)
+
+    def _list(self, cls, rule: Rule, start: int, results: list):
+        result = cls(rule=rule, at_position=start)
+        for sub_result in results:
+            result.append(sub_result, self.backward)
+        return result
+
+    def rule_trees(self, rule: Rule, start: int, end: int, path: frozenset):
+        """The results of ``rule`` over the span, ``path`` are the builder nodes above (a cycle is not followed)"""
+        if isinstance(rule, Rule_Main):
+            key = (id(rule), start, end)
+            if key in path or end not in self.builder_ends(rule, start):
+                return
+            for result in self.rule_trees(rule.rule, start, end, path | {key}):
+                yield self._wrap(rule, result)
+        elif isinstance(rule, Match):
+            token = self.get_token(start)
+            if token is None:
+                return
+            if token.pattern <= rule:
+                if end == self.next(start):
+                    yield MatchResult(rule=rule, token=token)
+                return
+            for builder in self.parser.get_all_matching_builders(rule):
+                yield from self.rule_trees(builder, start, end, path)
+        elif isinstance(rule, (As, In)):
+            for result in self.rule_trees(rule.rule, start, end, path):
+                yield self._wrap(rule, result)
+        elif isinstance(rule, Any):
+            for sub_rule in rule.rules:
+                for result in self.rule_trees(sub_rule, start, end, path):
+                    yield self._wrap(rule, result)
+        elif isinstance(rule, All):
+            for results in self._sequence_trees(rule, 0, start, end, path):
+                yield self._list(AllResult, rule, start, results)
+        elif isinstance(rule, Optional):
+            for result in self.rule_trees(rule.rule, start, end, path):
+                yield self._list(OptionalResult, rule, start, [result])
+            if start == end:
+                yield OptionalResult(rule=rule, at_position=start)
+        elif isinstance(rule, Repeat):
+            for results in self._repeat_trees(rule, start, end, path):
+                yield self._list(RepeatResult, rule, start, results)
+        else:
+            raise TypeError(rule)
+
+    def _sequence_trees(self, rule: All, index: int, start: int, end: int, path: frozenset):
+        rules = self.sequence(rule)
+        if index == len(rules):
+            if start == end:
+                yield []
+            return
+
+        for middle in self.ends(rules[index], start):
+            # the dead ends are skipped with the counts, which are memoized
+            if self.before(middle, end) and self._evaluate_sequence(COUNT, self.values.setdefault(COUNT, {}), rule, index + 1, middle, end):
+                for head in self.rule_trees(rules[index], start, middle, path):
+                    for tail in self._sequence_trees(rule, index + 1, middle, end, path):
+                        yield [head, *tail]
+
+    def _repeat_trees(self, rule: Repeat, start: int, end: int, path: frozenset):
+        for middle in self.ends(rule.rule, start):
+            if middle != start and self.before(middle, end) and self._evaluate_repeat(COUNT, self.values.setdefault(COUNT, {}), rule, middle, end):
+                for head in self.rule_trees(rule.rule, start, middle, path):
+                    for tail in self._repeat_trees(rule, middle, end, path):
+                        yield [head, *tail]
+        if start == end:
+            yield []
+
+    def _best_tree(self, semiring: Semiring, rule: Rule, start: int, end: int, path: frozenset):
+        """The tree of ``rule`` over the span following the alternatives which give its value"""
+        value = self.evaluate(semiring, rule, start, end)
+
+        if isinstance(rule, Rule_Main):
+            key = (id(rule), start, end)
+            if key in path:
+                return None
+            result = self._best_tree(semiring, rule.rule, start, end, path | {key})
+            return None if result is None else self._wrap(rule, result)
+        elif isinstance(rule, Match):
+            token = self.get_token(start)
+            if token.pattern <= rule:
+                return MatchResult(rule=rule, token=token)
+            for builder in self.parser.get_all_matching_builders(rule):
+                if self.evaluate(semiring, builder, start, end) == value:
+                    return self._best_tree(semiring, builder, start, end, path)
+        elif isinstance(rule, (As, In)):
+            result = self._best_tree(semiring, rule.rule, start, end, path)
+            return None if result is None else self._wrap(rule, result)
+        elif isinstance(rule, Any):
+            for sub_rule in rule.rules:
+                if self.evaluate(semiring, sub_rule, start, end) == value:
+                    result = self._best_tree(semiring, sub_rule, start, end, path)
+                    return None if result is None else self._wrap(rule, result)
+        elif isinstance(rule, All):
+            results = self._best_sequence(semiring, rule, 0, start, end, path)
+            return None if results is None else self._list(AllResult, rule, start, results)
+        elif isinstance(rule, Optional):
+            if value != semiring.zero and self.evaluate(semiring, rule.rule, start, end) == value:
+                result = self._best_tree(semiring, rule.rule, start, end, path)
+                return None if result is None else self._list(OptionalResult, rule, start, [result])
+            return OptionalResult(rule=rule, at_position=start)
+        elif isinstance(rule, Repeat):
+            results = self._best_repeat(semiring, rule, start, end, path)
+            return None if results is None else self._list(RepeatResult, rule, start, results)
+        return None
+
+    def _best_sequence(self, semiring: Semiring, rule: All, index: int, start: int, end: int, path: frozenset):
+        rules = self.sequence(rule)
+        if index == len(rules):
+            return []
+
+        values = self.values[semiring]
+        value = self._evaluate_sequence(semiring, values, rule, index, start, end)
+        for middle in self.ends(rules[index], start):
+            if self.before(middle, end):
+                tail = self._evaluate_sequence(semiring, values, rule, index + 1, middle, end)
+                if tail != semiring.zero and semiring.times(self.evaluate(semiring, rules[index], start, middle), tail) == value:
+                    head = self._best_tree(semiring, rules[index], start, middle, path)
+                    tail = self._best_sequence(semiring, rule, index + 1, middle, end, path)
+                    return None if head is None or tail is None else [head, *tail]
+
+    def _best_repeat(self, semiring: Semiring, rule: Repeat, start: int, end: int, path: frozenset):
+        values = self.values[semiring]
+        value = self._evaluate_repeat(semiring, values, rule, start, end)
+        for middle in self.ends(rule.rule, start):
+            if middle != start and self.before(middle, end):
+                tail = self._evaluate_repeat(semiring, values, rule, middle, end)
+                if tail != semiring.zero and semiring.times(self.evaluate(semiring, rule.rule, start, middle), tail) == value:
+                    head = self._best_tree(semiring, rule.rule, start, middle, path)
+                    tail = self._best_repeat(semiring, rule, middle, end, path)
+                    return None if head is None or tail is None else [head, *tail]
+        return [] if start == end else None
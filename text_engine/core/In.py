@@ -13,10 +13,12 @@ class In(Rule_Unit):
                "\n".join(f"  {line}" for line in str(self.rule).split("\n")) + \
                "\n]"
 
-    def parse(self, tokens: list, position: int, parser, backward: bool = False):
-        result = self.rule.parse(tokens, position, parser, backward)
+    def parse_steps(self, tokens: list, position: int, parser, backward: bool = False):
+        result = yield self.rule.parse_steps(tokens, position, parser, backward)
         if result:
             return InResult(rule=self, result=result)
+        elif parser.fast:
+            return result
         else:
             return Result_Error(
                 rule=self,
@@ -27,6 +29,7 @@ class In(Rule_Unit):
 
 
 class InResult(Result_Unit):
+    __slots__ = ()
     rule: In
 
     def __str__(self):
@@ -35,3 +38,11 @@ class InResult(Result_Unit):
     def build(self, context: Context):
         super().build(context)
         context.key_add(self.rule.key, context.pop_last())
+
+    def build_ast(self, astb, pile: list, data: dict):
+        self.result.build_ast(astb, pile, data)
+        data.setdefault(self.rule.key, []).append(pile.pop())
+
+    def build_steps(self, astb, pile: list, data: dict):
+        yield self.result.build_steps(astb, pile, data)
+        data.setdefault(self.rule.key, []).append(pile.pop())
@@ -0,0 +1,136 @@
+from .Engine import Engine, EngineTokenizeError
+from .Lexer import Lexer, TokenizeError
+from .Parser import Parser
+from .ASTB import ASTB
+from .LabeledTokens import LabeledTokens
+from ..base import Identified, Rule_Main
+
+
+class IncrementalEngine(Engine):
+    """
+        Engine for documents read again after each edit (forward only)
+        the tokens (see LabeledTokens) and the packrat memo of the last read are kept, an ``edit`` relexes only
+        the tokens around the edited text and the tokens and memoized results after it keep their positions,
+        the memoized results are reused unless they examined a replaced token
+        the parser of the engine is a packrat copy of ``parser`` (with the same builders and options)
+    """
+
+    def __init__(self, lexer: Lexer, parser: Parser, astb: ASTB = None, identifier: str = Identified.ALL):
+        parser = Parser(*parser.builders, packrat=True, fast=parser.fast, iterative=parser.iterative)
+        parser.apply_steps = self._apply_steps
+        super().__init__(lexer, parser, astb)
+        self.identifier = identifier
+        self.text = ""
+        self.tokens = None
+        # the furthest label examined to compute each memoized result and the number of edits it was checked for,
+        # per position
+        self.entries = {}
+        # the ranges of labels given up by each edit
+        self.edits = []
+
+    def read(self, text: str, identifier: str = None, index: int = 0, backward=False):
+        """Read ``text`` from scratch"""
+        assert not backward and index == 0, "an IncrementalEngine only reads whole texts forward"
+        if identifier is not None:
+            self.identifier = identifier
+
+        self.text = text
+        self.tokens = None
+        self.tokens = LabeledTokens(self._make_tokens(text), len(text))
+        self._forget()
+        return self._read_tokens()
+
+    def edit(self, offset: int, removed: int, inserted: str):
+        """Replace the ``removed`` characters at ``offset`` by ``inserted`` and read the new text"""
+        text = self.text[:offset] + inserted + self.text[offset + removed:]
+        if self.tokens is None:
+            return self.read(text)
+
+        try:
+            start, stop, tokens = self._relex(text, offset, removed, inserted)
+        except TokenizeError as e:
+            self.text = text
+            self.tokens = None
+            raise EngineTokenizeError([], e)
+
+        replaced = self.tokens.replace(start, stop, tokens, len(text))
+        if replaced is None:
+            self._forget()
+        else:
+            lo, hi, labels = replaced
+            # the results at the labels given up are dropped now, the ones before which examined them when they are
+            # looked up again (see ``_apply_steps``)
+            for label in labels:
+                for key in self.entries.pop(label, ()):
+                    self.parser.memo.drop(key)
+            self.edits.append((lo, hi))
+
+        self.text = text
+        return self._read_tokens()
+
+    def _forget(self):
+        self.parser.reset()
+        self.entries.clear()
+        self.edits.clear()
+
+    def _read_tokens(self):
+        results = self.parser.parse(self.tokens, self.tokens.first, self.identifier, reset=False)
+        for result in results:
+            if result and result.at_position == self.tokens.first and result.to_position == self.tokens.end:
+                for ast in self._make_asts([result]):
+                    return ast
+
+    def _apply_steps(self, builder: Rule_Main, tokens: LabeledTokens, position: int, backward: bool = False):
+        """``apply_steps`` of the parser, which keeps the furthest label examined for each memoized result"""
+        key = (id(builder), position, backward)
+        memo = self.parser.memo
+        entries = self.entries.get(position)
+        if entries is None:
+            entries = self.entries[position] = {}
+
+        entry = entries.get(key)
+        if entry is not None and entry[1] < len(self.edits):
+            reach = entry[0]
+            if key not in memo.table:
+                # forgotten with its left recursion, or pinned by a left recursion in progress (see Parser._purge)
+                entry = None
+            elif any(position < hi and reach >= lo for lo, hi in self.edits[entry[1]:]):
+                memo.drop(key)
+                entry = None
+            else:
+                entry[1] = len(self.edits)
+
+        outer, tokens.reach = tokens.reach, -1
+        result = yield Parser.apply_steps(self.parser, builder, tokens, position, backward)
+        reach = max(tokens.reach, entry[0]) if entry is not None else tokens.reach
+        # only the settled results are kept, the ones of a left recursion are pinned until it is done
+        if key in memo.table:
+            entries[key] = [reach, len(self.edits)]
+        else:
+            entries.pop(key, None)
+        tokens.reach = max(outer, reach)
+        return result
+
+    def _relex(self, text: str, offset: int, removed: int, inserted: str):
+        """
+            The old tokens [start:stop] to replace by the new ``tokens`` of ``text``
+            the lexing restarts one token before the first token touching the edit (a token can depend on the
+            characters which follow it) and stops once a token starts where an old token started after the edit
+        """
+        old = self.tokens
+        delta = len(inserted) - removed
+        end = offset + removed
+
+        start = max(0, old.search(offset, ends=True) - 1)
+        index = old.at_index(start) if start < len(old) else 0
+
+        tokens = []
+        for token in self.lexer.i_tokenize(text, index, start):
+            old_index = token.at_index - delta
+            if old_index > end:
+                stop = old.search(old_index)
+                if stop < len(old) and old.at_index(stop) == old_index and old.tokens[stop].content == token.content:
+                    return start, stop, tokens
+            tokens.append(token)
+
+        return start, len(old), tokens
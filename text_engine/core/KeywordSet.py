@@ -0,0 +1,40 @@
+from re import compile
+from .Pattern import Pattern
+from typing import List
+
+WORD = compile(r"\w+")
+
+
+class KeywordSet:
+    """
+        Consecutive "kw" patterns of a Lexer whose expression is a plain word, matched together :
+        the word at the position is read once and looked up in a table (the first pattern of a word wins)
+        instead of trying the regex of each keyword
+    """
+    patterns: List[Pattern]
+    ignore = False
+
+    def __init__(self, *patterns: Pattern):
+        self.patterns = list(patterns)
+        self.keywords = {}
+        for pattern in self.patterns:
+            self.keywords.setdefault(pattern.expr, pattern)
+
+    @staticmethod
+    def can_group(pattern: Pattern):
+        """True if ``pattern`` only matches its expression as a whole word"""
+        return pattern.mode == "kw" and not pattern.flag and not pattern.ignore and WORD.fullmatch(pattern.expr) is not None
+
+    def tokenize(self, text: str, index: int, position: int):
+        # same as the (?<!\w) and (?!\w) of the "kw" patterns : the word has to be a whole word
+        if index > 0 and WORD.match(text, index - 1):
+            return
+
+        match = WORD.match(text, index)
+        if match is None:
+            return
+
+        content = match.group()
+        pattern = self.keywords.get(content)
+        if pattern is not None:
+            return pattern.make_token(content, index, position)
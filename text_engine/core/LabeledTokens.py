@@ -0,0 +1,125 @@
+from typing import List
+from .Token import Token
+
+
+class LabeledTokens:
+    """
+        Tokens of an IncrementalEngine, the parser addresses them by label : their positions are increasing
+        but ``SPACING`` apart, so that the tokens of an edit take new labels between the ones of their neighbours
+        and the labels of the other tokens (and of the memoized results which refer to them) never change
+        ``end`` is the label after the last token, ``reach`` the furthest label accessed (see IncrementalEngine)
+        the character indexes of the tokens after ``gap`` are relative to the end of the text, so an edit only
+        updates the indexes of the tokens between the previous edit and itself
+    """
+    SPACING = 1 << 32
+
+    def __init__(self, tokens: List[Token], length: int):
+        self.tokens = []
+        self.labels = {}
+        self.gap = 0
+        self.length = length
+        self.end = 0
+        self.reach = -1
+        self.replace(0, 0, tokens, length)
+
+    def __getitem__(self, label: int) -> Token:
+        if label > self.reach:
+            self.reach = label
+        try:
+            return self.labels[label]
+        except KeyError:
+            raise IndexError(label)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+    @property
+    def first(self) -> int:
+        """The label of the first token (``end`` if there is none)"""
+        return self.tokens[0].at_position if self.tokens else self.end
+
+    def label(self, rank: int) -> int:
+        return self.tokens[rank].at_position if rank < len(self.tokens) else self.end
+
+    def at_index(self, rank: int) -> int:
+        """The index in the text of the ``rank``-th token"""
+        index = self.tokens[rank].at_index
+        return index if rank < self.gap else index + self.length
+
+    def to_index(self, rank: int) -> int:
+        index = self.tokens[rank].to_index
+        return index if rank < self.gap else index + self.length
+
+    def search(self, index: int, ends: bool = False) -> int:
+        """The rank of the first token which starts (ends if ``ends``) at or after ``index``"""
+        key = self.to_index if ends else self.at_index
+        lo, hi = 0, len(self.tokens)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key(mid) >= index:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def move_gap(self, rank: int):
+        """Make the indexes of the tokens before ``rank`` absolute and the ones after relative to the end"""
+        for token in self.tokens[self.gap:rank]:
+            token.at_index += self.length
+            token.to_index += self.length
+        for token in self.tokens[rank:self.gap]:
+            token.at_index -= self.length
+            token.to_index -= self.length
+        self.gap = rank
+
+    def replace(self, start: int, stop: int, tokens: List[Token], length: int):
+        """
+            Replace the tokens [start:stop] by ``tokens`` (indexed in the new text of ``length`` characters)
+            the kept tokens before ``start`` are labeled again with them when there is no room between
+            their neighbours, it returns the range [lo:hi] of the labels given up and the labels of the tokens
+            taken out of it, or None if all the tokens had to be labeled again (``SPACING`` apart)
+        """
+        self.move_gap(stop)
+        tokens = list(tokens)
+        count = 1
+        while not self._fits(start, stop, tokens):
+            if start == 0:
+                self._relabel(tokens + self.tokens[stop:], len(tokens), length)
+                return None
+            count, start, tokens = count * 2, max(0, start - count), self.tokens[max(0, start - count):start] + tokens
+
+        lo, hi = self.label(start), self.label(stop)
+        labels = [token.at_position for token in self.tokens[start:stop]]
+        for label in labels:
+            del self.labels[label]
+
+        step = (hi - lo) // len(tokens) if tokens else 0
+        for offset, token in enumerate(tokens):
+            token.at_position = lo + offset * step
+            token.to_position = token.at_position + step if offset + 1 < len(tokens) else hi
+            self.labels[token.at_position] = token
+
+        self.tokens[start:stop] = tokens
+        self.gap = start + len(tokens)
+        self.length = length
+        return lo, hi, labels
+
+    def _fits(self, start: int, stop: int, tokens: List[Token]) -> bool:
+        # the token before ``start`` ends at its label, so it can only be replaced by some tokens
+        if not tokens:
+            return start == 0
+        return self.label(stop) - self.label(start) >= len(tokens)
+
+    def _relabel(self, tokens: List[Token], gap: int, length: int):
+        self.tokens = tokens
+        self.labels = {}
+        for rank, token in enumerate(tokens):
+            token.at_position = rank * self.SPACING
+            token.to_position = token.at_position + self.SPACING
+            self.labels[token.at_position] = token
+        self.end = len(tokens) * self.SPACING
+        self.gap = gap
+        self.length = length
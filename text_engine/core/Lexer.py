@@ -1,4 +1,7 @@
 from .Pattern import Pattern
+from .PatternGroup import PatternGroup
+from .KeywordSet import KeywordSet
+from ..base import Identified, VersionedList
 from typing import List
 
 
@@ -7,23 +10,188 @@ class TokenizeError(Exception):
 
 
 class Lexer:
-    patterns: List[Pattern]
+    def __init__(self, *patterns: Pattern, compiled: bool = False):
+        self._lookup = {}
+        self._lookup_version = None
+        self.patterns = patterns
+        self.compiled = compiled
+        self._signature = None
+        self._index = {}
+        self._fallback = []
+        self._runs = {}
+        self._literals = {}
 
-    def __init__(self, *patterns: Pattern):
-        self.patterns = list(patterns)
+    @property
+    def patterns(self) -> VersionedList:
+        return self._patterns
+
+    @patterns.setter
+    def patterns(self, patterns: List[Pattern]):
+        self._patterns = VersionedList(patterns)
+        self._lookup.clear()
+        self._lookup_version = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.update(_signature=None, _index={}, _fallback=[], _runs={}, _literals={}, _lookup={}, _lookup_version=None)
+        return state
+
+    def get_index(self):
+        """
+            The first character -> matchers table of the lexer, and the matchers for the characters not in the table
+            the matchers of a character are the patterns which can start with it (or whose first characters are unknown)
+            sorted by priority, consecutive keywords are grouped into KeywordSets
+            and in compiled mode, consecutive patterns are folded into PatternGroups
+            the table is rebuilt only when the patterns of the lexer have changed
+        """
+        signature = (self.compiled, *map(id, self.patterns))
+        if signature != self._signature:
+            patterns = sorted(self.patterns, key=lambda pattern: pattern.priority)
+            self._signature = signature
+            self._index, self._fallback = self.build_index(patterns)
+            self._runs, self._literals = self.build_shortcuts(patterns)
+        return self._index, self._fallback
+
+    def set_index(self, index: dict, fallback: list):
+        """Use a table built by ``get_index`` (for instance loaded with the lexer), as long as the patterns don't change"""
+        self._signature = (self.compiled, *map(id, self.patterns))
+        self._index, self._fallback = index, fallback
+        self._runs, self._literals = self.build_shortcuts(sorted(self.patterns, key=lambda pattern: pattern.priority))
+
+    def get_matchers(self, char: str):
+        index, fallback = self.get_index()
+        return index.get(char, fallback)
+
+    def build_index(self, patterns: List[Pattern]):
+        chars = set()
+        for pattern in patterns:
+            if pattern.first_chars is not None:
+                chars.update(pattern.first_chars)
+
+        # characters with the same candidates share the same matchers
+        buckets = {}
+        index = {}
+        for char in chars:
+            bucket = tuple(pattern for pattern in patterns if pattern.first_chars is None or char in pattern.first_chars)
+            key = tuple(map(id, bucket))
+            if key not in buckets:
+                buckets[key] = self.build_matchers(bucket)
+            index[char] = buckets[key]
+
+        fallback = self.build_matchers([pattern for pattern in patterns if pattern.first_chars is None])
+        return index, fallback
+
+    @staticmethod
+    def build_shortcuts(patterns: List[Pattern]):
+        """
+            The characters whose first pattern always matches, so the lexer doesn't have to try it :
+            the ignored runs of a character class ("[ \t\n]+") skipped inline
+            and the single character literals whose token is made directly
+        """
+        runs = {}
+        literals = {}
+        for pattern in patterns:
+            if pattern.first_chars is None:
+                break
+            for char in pattern.first_chars:
+                if char in runs or char in literals:
+                    continue
+                if pattern.ignore and pattern.run_chars is not None:
+                    runs[char] = pattern
+                elif not pattern.ignore and pattern.mode == "str" and pattern.expr == char:
+                    literals[char] = pattern
+                else:
+                    # the first pattern of the character has to be tried
+                    literals[char] = None
+        return runs, {char: pattern for char, pattern in literals.items() if pattern is not None}
+
+    @staticmethod
+    def group_keywords(patterns: List[Pattern]):
+        """The ``patterns`` where each run of consecutive keywords is replaced by a KeywordSet"""
+        matchers = []
+        keywords = []
+        for pattern in (*patterns, None):
+            if pattern is not None and KeywordSet.can_group(pattern):
+                keywords.append(pattern)
+                continue
+            if len(keywords) > 1:
+                matchers.append(KeywordSet(*keywords))
+            else:
+                matchers.extend(keywords)
+            keywords = []
+            if pattern is not None:
+                matchers.append(pattern)
+        return matchers
+
+    def build_matchers(self, patterns: List[Pattern]):
+        matchers = self.group_keywords(patterns)
+        if not self.compiled:
+            return matchers
+
+        folded_matchers = []
+        folded = []
+        for matcher in matchers:
+            if isinstance(matcher, Pattern) and PatternGroup.can_fold(matcher):
+                folded.append(matcher)
+                continue
+            self.fold(folded_matchers, folded)
+            folded = []
+            folded_matchers.append(matcher)
+        self.fold(folded_matchers, folded)
+        return folded_matchers
+
+    @staticmethod
+    def fold(matchers: list, patterns: List[Pattern]):
+        # a single pattern is tried with its own regex
+        if len(patterns) > 1:
+            matchers.append(PatternGroup(*patterns))
+        else:
+            matchers.extend(patterns)
 
     def get_all_matching_patterns(self, identifier: str):
-        for pattern in self.patterns:
-            if pattern <= identifier:
-                yield pattern
+        """The patterns matching ``identifier``, cached per identifier until the pattern list changes"""
+        if self._patterns.version != self._lookup_version:
+            self._lookup_version = self._patterns.version
+            self._lookup.clear()
+
+        key = Identified.key_of(identifier)
+        patterns = self._lookup.get(key)
+        if patterns is None:
+            patterns = self._lookup[key] = tuple(pattern for pattern in self._patterns if pattern <= identifier)
+        return patterns
 
     def i_tokenize(self, text: str, index=0, position=0):
-        length = len(text) - index
+        length = len(text)
+        table, fallback = self.get_index()
+        runs, literals = self._runs, self._literals
         while index < length:
-            for pattern in sorted(self.patterns, key=lambda pattern: pattern.priority):
-                token = pattern.tokenize(text, index, position)
+            char = text[index]
+
+            pattern = runs.get(char)
+            if pattern is not None:
+                index += 1
+                # the longer runs are left to the regex engine
+                if index < length and text[index] in pattern.run_chars:
+                    index = pattern.skip(text, index)
+                continue
+
+            pattern = literals.get(char)
+            if pattern is not None:
+                yield pattern.make_token(char, index, position)
+                index += 1
+                position += 1
+                continue
+
+            for matcher in table.get(char, fallback):
+                if matcher.ignore:
+                    end = matcher.skip(text, index)
+                    if end > index:
+                        index = end
+                        break
+                    continue
+                token = matcher.tokenize(text, index, position)
                 if token:
-                    if not pattern.ignore:
+                    if not token.pattern.ignore:
                         yield token
                         position = token.to_position
                     index = token.to_index
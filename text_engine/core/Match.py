@@ -12,39 +12,74 @@ class Match(Rule, Identified):
     def __str__(self):
         return self.__class__.__name__ + "(" + self.identifier + ")"
 
-    def parse(self, tokens: List[Token], position: int, parser: Parser, backward: bool = False):
+    @staticmethod
+    def get_token(tokens, position: int):
+        """The token at ``position``, None if there is none (``tokens`` may be a lazy TokenWindow)"""
+        if position < 0:
+            return None
+        try:
+            return tokens[position]
+        except IndexError:
+            return None
+
+    def parse_steps(self, tokens: List[Token], position: int, parser: Parser, backward: bool = False):
         t_position = position - 1 if backward else position
-        if 0 <= t_position < len(tokens):
-            token = tokens[t_position]
-            if token.pattern <= self.identifier:
-                result = MatchResult(rule=self, token=token)
+        token = self.get_token(tokens, t_position)
+        if token is None:
+            return self.missing(parser, position, backward)
+        if token.pattern <= self:
+            return MatchResult(rule=self, token=token)
+        return self.builder_steps(tokens, position, parser, backward, token)
+
+    def builder_steps(self, tokens: List[Token], position: int, parser: Parser, backward: bool, token: Token):
+        """The steps of the alternatives tried when ``token`` isn't matched directly"""
+        count = 0
+        result = None
+        for builder in parser.get_all_matching_builders(self):
+            result = yield parser.apply_steps(builder, tokens, position, backward)
+            if result:
                 return result
+            else:
+                count += 1
+
+        return self.mismatch(parser, token, position, backward, count, result)
 
-            count = 0
-            result = None
-            for builder in parser.get_all_matching_builders(self.identifier):
-                result = builder.generate_output(tokens, position, parser, backward)
-                if result:
-                    return result
-                else:
-                    count += 1
-
-            return Result_Error(
-                rule=self,
-                at_position=position,
-                reason=f"Token {repr(token.pattern.identifier)} doesn't match {repr(self.identifier)}"
-                       f", {count} routine or builder correponding to {repr(self.identifier)} (no match)",
-                result=result if count == 1 else None
-            )
-        else:
-            return Result_Error(
-                rule=self,
-                at_position=position,
-                reason="No token remaining"
-            )
+    def mismatch(self, parser: Parser, token: Token, position: int, backward: bool, count: int, result):
+        """The failure when ``token`` doesn't match, after ``count`` alternatives failed (the last with ``result``)"""
+        t_position = position - 1 if backward else position
+        self.expect_mismatch(parser, t_position, backward, count)
+        if parser.fast:
+            return parser.failure
+
+        return Result_Error(
+            rule=self,
+            at_position=position,
+            reason=f"Token {repr(token.pattern.identifier)} doesn't match {repr(self.identifier)}"
+                   f", {count} routine or builder correponding to {repr(self.identifier)} (no match)",
+            result=result if count == 1 else None
+        )
+
+    def expect_mismatch(self, parser: Parser, t_position: int, backward: bool, count: int):
+        # only the matches without alternative to try are expected, the others failed further or within them
+        parser.expect(t_position, None if count else self.identifier, backward)
+
+    def missing(self, parser: Parser, position: int, backward: bool):
+        """The failure when there is no token left"""
+        t_position = position - 1 if backward else position
+        if parser.fast:
+            return parser.fail(t_position, backward, self.identifier)
+
+        parser.expect(t_position, self.identifier, backward)
+        return Result_Error(
+            rule=self,
+            at_position=position,
+            reason="No token remaining"
+        )
 
 
 class MatchResult(Result):
+    __slots__ = ("token",)
+
     def __init__(self, rule: Rule, token: Token):
         super().__init__(rule, token.at_position, token.to_position, layer=1)
         self.token = token
@@ -54,3 +89,6 @@ class MatchResult(Result):
 
     def build(self, context: Context):
         context.add_item(self.token.value)
+
+    def build_ast(self, astb, pile: list, data: dict):
+        pile.append(self.token.value)
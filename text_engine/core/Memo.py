@@ -0,0 +1,89 @@
+from collections import OrderedDict
+
+
+class Memo:
+    """
+        Packrat memo table of a Parser, results are stored per (rule identity, position, direction)
+        when ``size`` is given, the table keeps at most ``size`` entries and drops the least recently used ones
+        pinned entries (left recursions in progress) are never dropped, they live until the next reset
+    """
+    MISSING = object()
+
+    def __init__(self, size: int = None):
+        assert size is None or size > 0
+        self.size = size
+        self.table = OrderedDict()
+        self.pinned = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.table) + len(self.pinned)
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(size={self.size}, entries={len(self)}, " \
+               f"hits={self.hits}, misses={self.misses}, evictions={self.evictions})"
+
+    def get(self, key):
+        result = self.table.get(key, self.MISSING)
+        if result is self.MISSING:
+            result = self.pinned.get(key, self.MISSING)
+            if result is self.MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+        else:
+            self.hits += 1
+            if self.size is not None:
+                self.table.move_to_end(key)
+        return result
+
+    def set(self, key, result):
+        self.pinned.pop(key, None)
+        self.table[key] = result
+        if self.size is not None and len(self.table) > self.size:
+            self.table.popitem(last=False)
+            self.evictions += 1
+
+    def pin(self, key, value):
+        self.table.pop(key, None)
+        self.pinned[key] = value
+
+    def drop(self, key):
+        self.table.pop(key, None)
+        self.pinned.pop(key, None)
+
+    def clear(self):
+        self.table.clear()
+        self.pinned.clear()
+
+    def reset(self):
+        self.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def stats(self):
+        return dict(entries=len(self), hits=self.hits, misses=self.misses, evictions=self.evictions)
+
+
+class Head:
+    """Head of a left recursion, with the rules involved in it"""
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.involved = set()
+        self.eval_set = set()
+
+
+class LR:
+    """Pending rule application, stacked to detect left recursions"""
+
+    def __init__(self, rule, key: tuple, next_lr=None):
+        self.rule = rule
+        self.key = key
+        self.seed = None
+        self.head = None
+        self.next = next_lr
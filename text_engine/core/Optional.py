@@ -3,10 +3,10 @@ from .Parser import Parser
 
 
 class Optional(Rule_Unit):
-    def parse(self, tokens: list, position: int, parser: Parser, backward: bool = False):
+    def parse_steps(self, tokens: list, position: int, parser: Parser, backward: bool = False):
         results = OptionalResult(rule=self, at_position=position)
 
-        result = self.rule.parse(tokens, position, parser, backward)
+        result = yield self.rule.parse_steps(tokens, position, parser, backward)
 
         if result:
             results.append(result, backward)
@@ -15,4 +15,4 @@ class Optional(Rule_Unit):
 
 
 class OptionalResult(Result_List):
-    pass
+    __slots__ = ()
@@ -1,22 +1,352 @@
-from ..base import Identified, Rule_Main
+from ..base import Identified, Rule_Main, Result_Error, VersionedList
+from .Memo import Memo, Head, LR
+from types import GeneratorType
 from typing import List
 
 
+class ParseError(Exception):
+    """Nothing can be read : ``expected`` are the identifiers rejected by ``found_token`` at ``position``"""
+
+    def __init__(self, position, expected=frozenset(), found_token=None):
+        super().__init__(position, expected, found_token)
+        self.position = position
+        self.expected = frozenset(expected)
+        self.found_token = found_token
+
+    def __str__(self):
+        found = "end of text" if self.found_token is None else repr(self.found_token.content)
+        expected = " or ".join(sorted(self.expected)) or "end of text"
+        return f"Expected {expected} at token {self.position}, found {found}"
+
+
 class Parser:
-    builders: List[Rule_Main]
+    """
+        The parser keeps the furthest position where a token was rejected (``furthest``) and the identifiers
+        expected there (``expected``), from which ``error`` makes a ParseError
+        In ``fast`` mode, the rules fail with the shared ``failure`` sentinel instead of building a tree of
+        Result_Errors, the detailed errors can then be rebuilt with ``explain``
+        The rules are parsed with their ``parse_steps`` generators (see ``drive``), in ``iterative`` mode they are
+        driven by ``run`` instead of nested ``call``s, so the depth of the input is not limited by the recursion limit
+        (``parse_steps`` can also directly return the result when it doesn't depend on other rules)
+    """
+    memo: Memo
+    EVAL = object()
+
+    def __init__(self, *builders: Rule_Main, packrat: bool = False, memo_size: int = None, fast: bool = False,
+                 iterative: bool = False):
+        self._lookup = {}
+        self._lookup_version = None
+        self.builders = builders
+        self.memo = Memo(memo_size) if packrat else None
+        self.fast = fast
+        self.iterative = iterative
+        self.failure = Result_Error(rule=None, at_position=0, reason="Failure (fast mode)")
+        self.furthest = None
+        self.expected = set()
+        self.heads = {}
+        self.tainted = {}
+        self.lr_stack = None
+
+    @property
+    def builders(self) -> VersionedList:
+        return self._builders
+
+    @builders.setter
+    def builders(self, builders: List[Rule_Main]):
+        self._builders = VersionedList(builders)
+        self._lookup.clear()
+        self._lookup_version = None
+
+    @property
+    def packrat(self) -> bool:
+        return self.memo is not None
+
+    @packrat.setter
+    def packrat(self, value: bool):
+        if not value:
+            self.memo = None
+        elif self.memo is None:
+            self.memo = Memo()
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.update(heads={}, tainted={}, lr_stack=None, _lookup={}, _lookup_version=None)
+        # the methods replaced by a running Profiler or an IncrementalEngine
+        state.pop("apply_steps", None)
+        if self.memo is not None:
+            state["memo"] = Memo(self.memo.size)
+        return state
+
+    def expect(self, position: int, identifier: str = None, backward: bool = False):
+        """Note that the token at ``position`` doesn't match ``identifier`` (None when it is only rejected)"""
+        if self.furthest is None or (position < self.furthest if backward else position > self.furthest):
+            self.furthest = position
+            self.expected.clear()
+        elif position != self.furthest:
+            return
+        if identifier is not None:
+            self.expected.add(identifier)
+
+    def expect_all(self, position: int, identifiers, backward: bool = False):
+        """Note that the token at ``position`` doesn't match any of ``identifiers``"""
+        if self.furthest is None or (position < self.furthest if backward else position > self.furthest):
+            self.furthest = position
+            self.expected.clear()
+        elif position != self.furthest:
+            return
+        self.expected.update(identifiers)
+
+    def fail(self, position: int, backward: bool = False, identifier: str = None):
+        """The failure sentinel, ``furthest`` and ``expected`` are updated with ``position`` and ``identifier``"""
+        self.expect(position, identifier, backward)
+        return self.failure
 
-    def __init__(self, *builders: Rule_Main):
-        self.builders = list(builders)
+    def error(self, tokens: list) -> ParseError:
+        """The ParseError at the furthest position reached by the last parse"""
+        position = self.furthest
+        token = None
+        if position is not None and position >= 0:
+            try:
+                token = tokens[position]
+            except IndexError:
+                pass
+        return ParseError(position, self.expected, token)
 
     def get_all_matching_builders(self, identifier: str):
-        for builder in self.builders:
-            if builder <= identifier:
-                yield builder
+        """The builders matching ``identifier``, cached per identifier until the builder list changes"""
+        if self._builders.version != self._lookup_version:
+            self._lookup_version = self._builders.version
+            self._lookup.clear()
+
+        key = Identified.key_of(identifier)
+        builders = self._lookup.get(key)
+        if builders is None:
+            builders = self._lookup[key] = tuple(builder for builder in self._builders if builder <= identifier)
+        return builders
+
+    def apply(self, builder: Rule_Main, tokens: list, position: int, backward: bool = False):
+        """The result of ``builder`` at ``position``, see ``apply_steps``"""
+        return self.drive(self.apply_steps(builder, tokens, position, backward))
+
+    def apply_steps(self, builder: Rule_Main, tokens: list, position: int, backward: bool = False):
+        """
+            The steps of ``builder`` at ``position``, in packrat mode the result is memoized
+            so each (builder, position, direction) is parsed at most once per parse
+            and left recursive builders are handled by growing a seed parse (Warth et al.),
+            the memoized results are returned directly
+        """
+        if self.memo is None:
+            return builder.parse_steps(tokens, position, self, backward)
+
+        key = (id(builder), position, backward)
+        entry = self._recall(builder, key, position, backward)
+
+        if entry is self.EVAL or entry is Memo.MISSING:
+            return self._eval_steps(builder, key, tokens, position, backward, entry)
+
+        elif isinstance(entry, LR):
+            self._setup_lr(builder, entry)
+            return self._seed(entry, position)
+
+        else:
+            return entry
+
+    def _eval_steps(self, builder: Rule_Main, key: tuple, tokens: list, position: int, backward: bool, entry):
+        """The evaluation of ``builder`` when its result is not memoized, growing it if it is left recursive"""
+        if entry is self.EVAL:
+            entry = yield builder.parse_steps(tokens, position, self, backward)
+            self.memo.pin(key, entry)
+            return entry
+
+        else:
+            lr = self._push(builder, key)
+            result = yield builder.parse_steps(tokens, position, self, backward)
+            result, grow = self._answer(builder, key, position, backward, lr, result)
+
+            if grow:
+                self._grow_start(key, position, backward, lr.head, result)
+                while True:
+                    lr.head.eval_set = set(lr.head.involved)
+                    grown = yield builder.parse_steps(tokens, position, self, backward)
+                    if not self._grows(grown, result, backward):
+                        break
+                    result = grown
+                    self.memo.pin(key, result)
+                self._grow_end(key, position, backward, result)
+
+            self._purge(key, position, backward)
+            return result
+
+    def _recall(self, builder: Rule_Main, key: tuple, position: int, backward: bool):
+        """The memoized entry of ``key``, ``EVAL`` if ``builder`` has to be evaluated again"""
+        entry = self.memo.get(key)
+        head = self.heads.get((position, backward))
+
+        if head is None:
+            return entry
+
+        # while growing a seed, only the rules involved in the left recursion can be evaluated
+        if entry is Memo.MISSING and builder is not head.rule and id(builder) not in head.involved:
+            if self.fast:
+                return self.failure
+            return Result_Error(
+                rule=builder,
+                at_position=position,
+                reason=f"{builder.identifier!r} is not involved in the left recursion of {head.rule.identifier!r}"
+            )
+
+        # involved rules are evaluated once per seed-growing iteration
+        if id(builder) in head.eval_set:
+            head.eval_set.discard(id(builder))
+            return self.EVAL
+
+        return entry
+
+    def _push(self, builder: Rule_Main, key: tuple):
+        lr = LR(builder, key, self.lr_stack)
+        self.lr_stack = lr
+        self.memo.pin(key, lr)
+        return lr
+
+    def _answer(self, builder: Rule_Main, key: tuple, position: int, backward: bool, lr: LR, result):
+        """The result of the first evaluation of ``builder``, and if it is the seed of a left recursion to grow"""
+        self.lr_stack = lr.next
+
+        if lr.head is None:
+            self.memo.set(key, result)
+            return result, False
+
+        self.tainted.setdefault((position, backward), []).append(key)
+        lr.seed = result
+        seed = self._seed(lr, position)
+
+        if lr.head.rule is not builder:
+            return seed, False
+
+        if not seed:
+            self.memo.set(key, seed)
+            return seed, False
+
+        return seed, True
+
+    def _purge(self, key: tuple, position: int, backward: bool):
+        # the results of a left recursion depend on the rule that started it,
+        # they are forgotten once the outermost application at this position is done
+        if self.tainted and (self.lr_stack is None or self.lr_stack.key[1:] != key[1:]):
+            for tainted_key in self.tainted.pop((position, backward), ()):
+                self.memo.drop(tainted_key)
+
+    def _setup_lr(self, builder: Rule_Main, lr: LR):
+        if lr.head is None:
+            lr.head = Head(builder)
+
+        stack = self.lr_stack
+        while stack is not None and stack.head is not lr.head:
+            stack.head = lr.head
+            lr.head.involved.add(id(stack.rule))
+            stack = stack.next
+
+    def _grow_start(self, key: tuple, position: int, backward: bool, head: Head, result):
+        self.memo.pin(key, result)
+        self.heads[(position, backward)] = head
+
+    @staticmethod
+    def _grows(grown, result, backward: bool) -> bool:
+        if not grown:
+            return False
+        if backward:
+            return grown.at_position < result.at_position
+        return grown.to_position > result.to_position
+
+    def _grow_end(self, key: tuple, position: int, backward: bool, result):
+        del self.heads[(position, backward)]
+        self.memo.set(key, result)
+
+    def _seed(self, lr: LR, position: int):
+        if lr.seed is None and self.fast:
+            lr.seed = self.failure
+        elif lr.seed is None:
+            lr.seed = Result_Error(
+                rule=lr.rule,
+                at_position=position,
+                reason=f"Left recursion on {lr.rule.identifier!r} at {position}"
+            )
+        return lr.seed
+
+    def drive(self, steps):
+        """The result of ``steps``, driven by ``run`` in iterative mode and by ``call`` otherwise"""
+        return self.run(steps) if self.iterative else self.call(steps)
+
+    @staticmethod
+    def call(steps):
+        """
+            Drive the generator ``steps`` with nested calls : each generator it yields is driven by a call to ``call``
+            whose result is sent back, so the depth of the input is limited by the recursion limit
+        """
+        if steps.__class__ is not GeneratorType:
+            return steps
+
+        call = Parser.call
+        send = steps.send
+        value = None
+        try:
+            while True:
+                value = send(value)
+                if value.__class__ is GeneratorType:
+                    value = call(value)
+        except StopIteration as stop:
+            return stop.value
+
+    @staticmethod
+    def run(steps):
+        """
+            Drive the generator ``steps`` without recursion : each generator it yields is pushed on an explicit
+            stack and driven in turn, its return value being sent back to the generator below it
+        """
+        if not isinstance(steps, GeneratorType):
+            return steps
+
+        stack = [steps]
+        value = None
+        while True:
+            try:
+                steps = stack[-1].send(value)
+            except StopIteration as stop:
+                stack.pop()
+                if not stack:
+                    return stop.value
+                value = stop.value
+            else:
+                if isinstance(steps, GeneratorType):
+                    stack.append(steps)
+                    value = None
+                else:
+                    value = steps
+
+    def reset(self, memo: bool = True):
+        if memo and self.memo is not None:
+            self.memo.reset()
+        self.furthest = None
+        self.expected.clear()
+        self.heads.clear()
+        self.tainted.clear()
+        self.lr_stack = None
+
+    def parse(self, tokens: list, position: int, identifier: str = Identified.ALL, backward: bool = False,
+              reset: bool = True):
+        self.reset(memo=reset)
 
-    def parse(self, tokens: list, position: int, identifier: str = Identified.ALL, backward: bool = False):
         for builder in self.get_all_matching_builders(identifier):
-            result = builder.parse(tokens, position, self, backward)
-            yield result
+            yield self.apply(builder, tokens, position, backward)
+
+    def explain(self, tokens: list, position: int, identifier: str = Identified.ALL, backward: bool = False):
+        """The results of ``parse`` with the detailed errors, even in fast mode"""
+        fast = self.fast
+        self.fast = False
+        try:
+            return list(self.parse(tokens, position, identifier, backward))
+        finally:
+            self.fast = fast
 
     def add_builder(self, identifier, rule):
         raise NotImplementedError
@@ -1,7 +1,71 @@
-from re import compile
+from re import compile, IGNORECASE
 from .Token import Token
 from ..base import Identified
 
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # python < 3.11
+    import sre_parse, sre_constants
+
+MAX_RANGE = 256
+
+
+def _first_chars_item(op, av):
+    if op is sre_constants.LITERAL:
+        return {chr(av)}, False
+
+    if op is sre_constants.IN:
+        chars = set()
+        for sub_op, sub_av in av:
+            if sub_op is sre_constants.LITERAL:
+                chars.add(chr(sub_av))
+            elif sub_op is sre_constants.RANGE and sub_av[1] - sub_av[0] < MAX_RANGE:
+                chars.update(map(chr, range(sub_av[0], sub_av[1] + 1)))
+            else:
+                return None, False
+        return chars, False
+
+    if op is sre_constants.BRANCH:
+        chars = set()
+        nullable = False
+        for items in av[1]:
+            sub_chars, sub_nullable = _first_chars(items)
+            if sub_chars is None:
+                return None, False
+            chars |= sub_chars
+            nullable |= sub_nullable
+        return chars, nullable
+
+    if op is sre_constants.SUBPATTERN:
+        if av[1] & IGNORECASE:
+            return None, False
+        return _first_chars(av[-1])
+
+    if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, "POSSESSIVE_REPEAT", None)):
+        chars, nullable = _first_chars(av[2])
+        return chars, nullable or av[0] == 0
+
+    if op is getattr(sre_constants, "ATOMIC_GROUP", None):
+        return _first_chars(av)
+
+    return None, False
+
+
+def _first_chars(items):
+    """the characters a non empty match of ``items`` can start with (None if unknown) and if it can match ''"""
+    chars = set()
+    for op, av in items:
+        # zero width assertions only restrict the match
+        if op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            continue
+        item_chars, nullable = _first_chars_item(op, av)
+        if item_chars is None:
+            return None, False
+        chars |= item_chars
+        if not nullable:
+            return chars, False
+    return chars, True
+
 
 class Pattern(Identified):
     mode: str
@@ -29,6 +93,41 @@ class Pattern(Identified):
         else:
             self.regex = None
 
+        self.first_chars = self.get_first_chars()
+        self.run_chars = self.get_run_chars()
+
+    def get_first_chars(self):
+        """The characters the tokens of this pattern can start with, None when they can't be derived"""
+        if self.mode == "str":
+            return frozenset(self.expr[:1]) or None
+
+        parsed = sre_parse.parse(self.expr, self.flag)
+        if parsed.state.flags & IGNORECASE:
+            return None
+
+        chars, _ = _first_chars(parsed.data)
+        return None if chars is None else frozenset(chars)
+
+    def get_run_chars(self):
+        """The characters of the class when this pattern matches a run of it ("[ \t\n]+"), None otherwise"""
+        if self.mode != "re":
+            return None
+
+        parsed = sre_parse.parse(self.expr, self.flag)
+        if parsed.state.flags & IGNORECASE or len(parsed.data) != 1:
+            return None
+
+        op, av = parsed.data[0]
+        if op not in (sre_constants.MAX_REPEAT, getattr(sre_constants, "POSSESSIVE_REPEAT", None)):
+            return None
+
+        lo, hi, items = av
+        if lo != 1 or hi is not sre_constants.MAXREPEAT or len(items) != 1 or items[0][0] not in (sre_constants.LITERAL, sre_constants.IN):
+            return None
+
+        chars, _ = _first_chars_item(*items[0])
+        return None if chars is None else frozenset(chars)
+
     def make_token(self, content, at_index, at_position):
         if self.value is None:
             value = content
@@ -45,6 +144,13 @@ class Pattern(Identified):
             value=value
         )
 
+    def skip(self, text: str, index: int):
+        """The end of the match at ``index`` (-1 if there is none), for ignored patterns which need no token"""
+        if self.regex:
+            match = self.regex.match(text, index)
+            return -1 if match is None else match.end()
+        return index + len(self.expr) if text.startswith(self.expr, index) else -1
+
     def tokenize(self, text: str, index: int, position: int):
         content = ""
         if self.regex:
@@ -0,0 +1,73 @@
+from re import compile, error, escape, IGNORECASE, MULTILINE, DOTALL, VERBOSE, ASCII, UNICODE
+from .Pattern import Pattern
+from typing import List
+
+SCOPED_FLAGS = {IGNORECASE: "i", MULTILINE: "m", DOTALL: "s", VERBOSE: "x", ASCII: "a"}
+
+
+class PatternGroup:
+    """
+        Consecutive patterns of a Lexer folded into one alternation regex (one named group per pattern)
+        the alternatives are tried in order by the regex engine, the matching pattern is found with ``lastgroup``
+    """
+    patterns: List[Pattern]
+    ignore = False
+
+    def __init__(self, *patterns: Pattern):
+        self.patterns = list(patterns)
+        self.names = {f"_{index}": pattern for index, pattern in enumerate(self.patterns)}
+        self.regex = compile("|".join(
+            f"(?P<{name}>{self.scoped_expr(pattern)})" for name, pattern in self.names.items()
+        ))
+
+    @staticmethod
+    def scoped_expr(pattern: Pattern):
+        if pattern.mode == "str":
+            return escape(pattern.expr)
+
+        if pattern.mode == "kw":
+            expr = r"(?<!\w)(?:" + pattern.expr + r")(?!\w)"
+        else:
+            expr = pattern.expr
+
+        flags = "".join(letter for flag, letter in SCOPED_FLAGS.items() if pattern.flag & flag)
+        return f"(?{flags}:{expr})" if flags else f"(?:{expr})"
+
+    @classmethod
+    def can_fold(cls, pattern: Pattern):
+        """True if ``pattern`` behaves the same once inserted in an alternation, and is faster there"""
+        # ignored patterns are faster on their own, they are skipped without making a token
+        if pattern.ignore:
+            return False
+
+        if pattern.mode == "str":
+            return True
+
+        if pattern.flag & ~(IGNORECASE | MULTILINE | DOTALL | VERBOSE | ASCII | UNICODE):
+            return False
+
+        # named groups would collide and numbered back references would be shifted
+        if pattern.regex.groupindex or "(?P=" in pattern.expr or any(f"\\{digit}" in pattern.expr for digit in "123456789"):
+            return False
+
+        try:
+            compile(f"(?P<_>{cls.scoped_expr(pattern)})")
+        except error:
+            return False
+
+        return True
+
+    def tokenize(self, text: str, index: int, position: int):
+        match = self.regex.match(text, index)
+        if match is None:
+            return
+
+        content = match.group()
+        if content:
+            return self.names[match.lastgroup].make_token(content, index, position)
+
+        # a pattern matched the empty string before the others got tried, they are tried one by one
+        for pattern in self.patterns:
+            token = pattern.tokenize(text, index, position)
+            if token:
+                return token
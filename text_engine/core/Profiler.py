@@ -0,0 +1,138 @@
+from time import perf_counter
+from .Parser import Parser
+from ..base import Rule_Main
+
+
+class RuleStats:
+    """
+        Measures of the applications of the builders and routines of an identifier
+        a backtrack is a failed application which had successful sub applications (their work is thrown away)
+        the cumulative time of recursive applications is only counted for the outermost one
+    """
+    __slots__ = ("identifier", "calls", "successes", "backtracks", "cumulative", "self_time")
+
+    def __init__(self, identifier: str):
+        self.identifier = identifier
+        self.calls = 0
+        self.successes = 0
+        self.backtracks = 0
+        self.cumulative = 0.0
+        self.self_time = 0.0
+
+    def __str__(self):
+        return f"{self.identifier:<20} {self.calls:>9} {self.successes:>9} {self.backtracks:>10} " \
+               f"{self.cumulative * 1000:>12.3f} {self.self_time * 1000:>12.3f}"
+
+
+class Profiler:
+    """
+        Instrumentation of the applications of builders and routines of a Parser
+        while it is started (or used as a context manager), the ``apply_steps`` of the parser
+        is replaced by a timed one wrapping it, the parser is left untouched otherwise so there is no overhead
+        when disabled
+        the stacks of applications are kept to export the self times as collapsed stacks (see ``collapsed``)
+    """
+
+    def __init__(self, parser: Parser):
+        self.parser = parser
+        self.stats = {}
+        self.stacks = {}
+        self.frames = []
+        self.path = []
+        self.active = {}
+        # the ``apply_steps`` set on the parser before ``start`` (by an IncrementalEngine), if any
+        self.applied = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        self.frames.clear()
+        self.path.clear()
+        self.active.clear()
+        applied = self.parser.__dict__.get("apply_steps")
+        if applied != self.apply_steps:
+            self.applied = applied
+            self.parser.apply_steps = self.apply_steps
+
+    def stop(self):
+        if self.parser.__dict__.get("apply_steps") != self.apply_steps:
+            return
+        if self.applied is None:
+            del self.parser.apply_steps
+        else:
+            self.parser.apply_steps = self.applied
+        self.applied = None
+
+    def reset(self):
+        self.stats.clear()
+        self.stacks.clear()
+
+    def _enter(self, builder: Rule_Main):
+        identifier = builder.identifier
+        self.path.append(identifier)
+        self.active[identifier] = self.active.get(identifier, 0) + 1
+        # [start, time of the sub applications, if a sub application succeeded]
+        self.frames.append([perf_counter(), 0.0, False])
+
+    def _exit(self, builder: Rule_Main, result):
+        start, children, progressed = self.frames.pop()
+        elapsed = perf_counter() - start
+        identifier = builder.identifier
+
+        stats = self.stats.get(identifier)
+        if stats is None:
+            stats = self.stats[identifier] = RuleStats(identifier)
+
+        stats.calls += 1
+        if result:
+            stats.successes += 1
+        elif progressed:
+            stats.backtracks += 1
+
+        self.active[identifier] -= 1
+        if not self.active[identifier]:
+            stats.cumulative += elapsed
+
+        self_time = elapsed - children
+        stats.self_time += self_time
+
+        path = tuple(self.path)
+        self.stacks[path] = self.stacks.get(path, 0.0) + self_time
+        self.path.pop()
+
+        if self.frames:
+            frame = self.frames[-1]
+            frame[1] += elapsed
+            if result:
+                frame[2] = True
+
+    def apply_steps(self, builder: Rule_Main, tokens: list, position: int, backward: bool = False):
+        self._enter(builder)
+        if self.applied is None:
+            result = yield Parser.apply_steps(self.parser, builder, tokens, position, backward)
+        else:
+            result = yield self.applied(builder, tokens, position, backward)
+        self._exit(builder, result)
+        return result
+
+    def report(self, limit: int = None):
+        """The stats of the identifiers as a table, sorted by decreasing self time (times in ms)"""
+        lines = [f"{'identifier':<20} {'calls':>9} {'successes':>9} {'backtracks':>10} {'cumulative':>12} {'self':>12}"]
+        stats = sorted(self.stats.values(), key=lambda item: item.self_time, reverse=True)
+        lines.extend(map(str, stats[:limit]))
+        return "\n".join(lines)
+
+    def collapsed(self):
+        """The self times of the stacks of applications in the collapsed stack format of flamegraph (in µs)"""
+        for path, self_time in self.stacks.items():
+            yield ";".join(path) + " " + str(round(self_time * 1e6))
+
+    def write_collapsed(self, filename: str):
+        with open(filename, mode="w", encoding="utf-8") as file:
+            for line in self.collapsed():
+                file.write(line + "\n")
@@ -1,14 +1,14 @@
-from ..base import Rule_Unit, Result_List
+from ..base import Rule, Rule_Unit, Result_List
 from .Parser import Parser
 
 
 class Repeat(Rule_Unit):
-    def parse(self, tokens: list, position: int, parser: Parser, backward: bool = False):
+    def parse_steps(self, tokens: list, position: int, parser: Parser, backward: bool = False):
         results = RepeatResult(rule=self, at_position=position)
 
         while True:
             r_position = results.at_position if backward else results.to_position
-            result = self.rule.parse(tokens, r_position, parser, backward)
+            result = yield self.rule.parse_steps(tokens, r_position, parser, backward)
 
             if not result:
                 results.error = result
@@ -20,7 +20,11 @@ class Repeat(Rule_Unit):
 
 
 class RepeatResult(Result_List):
-    error = None
+    __slots__ = ("error",)
+
+    def __init__(self, rule: Rule, at_position: int):
+        super().__init__(rule, at_position)
+        self.error = None
 
     def __str__(self):
         s = super().__str__() + self.__str_body__()
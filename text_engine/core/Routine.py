@@ -3,10 +3,12 @@ from .Parser import Parser
 
 
 class Routine(Rule_Main):
-    def parse(self, tokens: list, position: int, parser: Parser, backward: bool = False):
-        result = self.rule.parse(tokens, position, parser, backward)
+    def parse_steps(self, tokens: list, position: int, parser: Parser, backward: bool = False):
+        result = yield self.rule.parse_steps(tokens, position, parser, backward)
         if result:
             return RoutineResult(rule=self, result=result)
+        elif parser.fast:
+            return result
         else:
             return Result_Error(
                 rule=self,
@@ -17,6 +19,7 @@ class Routine(Rule_Main):
 
 
 class RoutineResult(Result_Unit):
+    __slots__ = ()
     rule: Routine
 
     def __str__(self):
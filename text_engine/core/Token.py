@@ -2,12 +2,15 @@ from ..base import PositionedItem, LayeredItem, IndexedItem
 
 
 class Token(PositionedItem, LayeredItem, IndexedItem):
+    __slots__ = ("at_position", "to_position", "at_index", "to_index", "layer", "pattern", "content", "value")
     content: str
 
     def __init__(self, pattern, content: str, at_index: int, at_position: int, value=None):
-        PositionedItem.__init__(self, at_position, at_position + 1)
-        IndexedItem.__init__(self, at_index, at_index + len(content))
-        LayeredItem.__init__(self, layer=0)
+        self.at_position = at_position
+        self.to_position = at_position + 1
+        self.at_index = at_index
+        self.to_index = at_index + len(content)
+        self.layer = 0
 
         self.pattern = pattern
         self.content = content
@@ -0,0 +1,48 @@
+from collections import deque
+from typing import Iterator
+from .Token import Token
+
+
+class DiscardedTokenError(Exception):
+    pass
+
+
+class TokenWindow:
+    """
+        Lazy sequence of the tokens of a Lexer, the tokens are pulled from ``tokens`` when they are accessed
+        and only the ones after the last ``discard`` position are kept in memory
+        ``peak`` is the maximum number of tokens held at once
+    """
+
+    def __init__(self, tokens: Iterator[Token]):
+        self.tokens = iter(tokens)
+        self.buffer = deque()
+        self.offset = 0
+        self.exhausted = False
+        self.peak = 0
+
+    def _pull(self, position: int):
+        while not self.exhausted and position >= self.offset + len(self.buffer):
+            try:
+                self.buffer.append(next(self.tokens))
+            except StopIteration:
+                self.exhausted = True
+        self.peak = max(self.peak, len(self.buffer))
+
+    def __getitem__(self, position: int) -> Token:
+        if position < self.offset:
+            raise DiscardedTokenError(f"Token {position} has been discarded, the window starts at {self.offset}")
+        self._pull(position)
+        if position >= self.offset + len(self.buffer):
+            raise IndexError(position)
+        return self.buffer[position - self.offset]
+
+    def at_end(self, position: int) -> bool:
+        self._pull(position)
+        return position >= self.offset + len(self.buffer)
+
+    def discard(self, position: int):
+        """Forget the tokens before ``position``"""
+        while self.buffer and self.offset < position:
+            self.buffer.popleft()
+            self.offset += 1
@@ -1,10 +1,18 @@
 from .Pattern import Pattern
 from .Token import Token
+from .PatternGroup import PatternGroup
+from .KeywordSet import KeywordSet
 
 from .Lexer import Lexer
+from .Memo import Memo
+from .TokenWindow import TokenWindow
+from .LabeledTokens import LabeledTokens
 from .Parser import Parser
+from .Profiler import Profiler
 from .ASTB import ASTB
+from .Forest import Forest
 from .Engine import Engine
+from .IncrementalEngine import IncrementalEngine
 
 from .Builder import Builder
 from .Routine import Routine
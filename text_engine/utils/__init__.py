@@ -1,4 +1,5 @@
 from .base import base
 from .display import display
 from .optimize import optimize
+from .cache import GrammarCache, grammar_hash
 from .operators import *
@@ -0,0 +1,110 @@
+import os
+import pickle
+import sys
+from hashlib import sha256
+from types import CodeType
+from ..core import *
+from .optimize import Compiler
+
+# changes when the compiled grammars of a previous version can't be loaded anymore
+CACHE_VERSION = 2
+
+
+def _describe_code(code: CodeType):
+    # the nested functions are code objects in the constants, their repr holds their address
+    consts = tuple(_describe_code(const) if isinstance(const, CodeType) else repr(const) for const in code.co_consts)
+    return f"{code.co_code.hex()} {consts} {code.co_names}"
+
+
+def _describe_value(value):
+    """The description of a pattern value, the functions are described by their name and body"""
+    if callable(value):
+        description = getattr(value, "__module__", "") + "." + getattr(value, "__qualname__", repr(value))
+        code = getattr(value, "__code__", None)
+        if code is not None:
+            cells = tuple(_describe_value(cell.cell_contents) for cell in value.__closure__ or ())
+            defaults = tuple(map(_describe_value, value.__defaults__ or ()))
+            description += f" {_describe_code(code)} {defaults} {cells}"
+        return description
+    return repr(value)
+
+
+def grammar_hash(engine: Engine):
+    """
+        The hash of the grammar of ``engine`` : its patterns (in order) and builders,
+        the ast classes and the options of the parser are not part of the grammar
+    """
+    digest = sha256(f"{CACHE_VERSION} {sys.version_info[:2]}".encode())
+    for pattern in engine.lexer.patterns:
+        description = (pattern.identifier, pattern.mode, pattern.expr, pattern.flag, pattern.ignore,
+                       _describe_value(pattern.value), pattern.priority)
+        digest.update(repr(description).encode())
+    for builder in engine.parser.builders:
+        digest.update(str(builder).encode())
+    return digest.hexdigest()
+
+
+class GrammarCache:
+    """
+        Directory of compiled grammars (the compiled lexer with its first character table, and the flattened rules
+        of the compiled parser, see Compiler) named by the ``grammar_hash`` of their source grammar
+        so a process reading with an already compiled grammar loads it instead of compiling it again
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key: str):
+        return os.path.join(self.directory, key + ".grammar")
+
+    def load(self, key: str):
+        """The (lexer, parser) saved as ``key``, None if there is none (or it can't be loaded, then the file is removed)"""
+        path = self.path(key)
+        try:
+            with open(path, mode="rb") as file:
+                lexer, parser, index, fallback = pickle.load(file)
+            lexer.set_index(index, fallback)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError, TypeError):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+        return lexer, parser
+
+    def save(self, key: str, lexer: Lexer, parser: Parser):
+        """Save a compiled grammar, the grammars whose values can't be pickled (lambdas) are not saved"""
+        try:
+            data = pickle.dumps((lexer, parser, *lexer.get_index()))
+        except (pickle.PicklingError, AttributeError, TypeError):
+            return False
+
+        os.makedirs(self.directory, exist_ok=True)
+        # written under another name first, so that concurrent processes never load a partial file
+        temporary = self.path(key) + f".{os.getpid()}.tmp"
+        with open(temporary, mode="wb") as file:
+            file.write(data)
+        os.replace(temporary, self.path(key))
+        return True
+
+    def compile(self, engine: Engine):
+        """The compiled Engine of ``engine`` (with the same ast builder and parser options), from the cache if possible"""
+        key = grammar_hash(engine)
+        grammar = self.load(key)
+        if grammar is None:
+            self.misses += 1
+            compiled = Compiler(engine).compile()
+            self.save(key, compiled.lexer, compiled.parser)
+            return compiled
+
+        self.hits += 1
+        lexer, parser = grammar
+        parser.fast = engine.parser.fast
+        parser.iterative = engine.parser.iterative
+        parser.memo = Memo(engine.parser.memo.size) if engine.parser.packrat else None
+        return Engine(lexer, parser, engine.astb)
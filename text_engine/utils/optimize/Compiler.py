@@ -0,0 +1,274 @@
+from ...base import Rule, Rule_Main
+from ...core import *
+from .Optimized_Match import Optimized_Match
+from .Optimized_Pattern import Optimized_Pattern
+
+
+class Compiler:
+    """
+        Compiles the grammar of an Engine :
+        - the patterns are copied as Optimized_Patterns making tokens tagged with an integer pattern id
+        - every Match is resolved once to its pattern ids and builders
+        - Routines are inlined in the Matches that use them, except the ones which can call themselves
+          without consuming a token (they are the heads of the left recursions of the packrat mode)
+        - the alternatives of a Match are guarded by the patterns they can start (or end, when parsing backward) with
+        - nested All / Any are flattened, and single rule All / Any are replaced by their rule
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.patterns = {}
+        self.builders = {}
+        self.inlined = {}
+        self.inlining = set()
+        self.nullable = set()
+        self.recursive = set()
+        self.bounds = {False: {}, True: {}}
+        self.expects = {False: {}, True: {}}
+
+    def compile_lexer(self):
+        lexer = Lexer(compiled=True)
+        for pattern_id, pattern in enumerate(sorted(self.engine.lexer.patterns, key=lambda pattern: pattern.priority)):
+            o_pattern = Optimized_Pattern(
+                pattern_id=pattern_id,
+                identifier=pattern.identifier,
+                mode=pattern.mode,
+                expr=pattern.expr,
+                flag=pattern.flag,
+                ignore=pattern.ignore,
+                value=pattern.value,
+                priority=pattern.priority
+            )
+            self.patterns[id(pattern)] = o_pattern
+            lexer.patterns.append(o_pattern)
+        return lexer
+
+    def _leading(self, rule: Rule, backward: bool):
+        """The builders ``rule`` can apply before consuming a token, and if ``rule`` can match no token"""
+        if isinstance(rule, Rule_Main):
+            return {id(rule)}, id(rule) in self.nullable
+        elif isinstance(rule, Optimized_Match):
+            leading = set()
+            nullable = False
+            for sub_rule in rule.rules:
+                sub_leading, sub_nullable = self._leading(sub_rule, backward)
+                leading |= sub_leading
+                nullable |= sub_nullable
+            return leading, nullable
+        elif isinstance(rule, Match):
+            builders = tuple(self.engine.parser.get_all_matching_builders(rule.identifier))
+            return set(map(id, builders)), any(id(builder) in self.nullable for builder in builders)
+        elif isinstance(rule, All):
+            leading = set()
+            for sub_rule in (reversed(rule.rules) if backward else rule.rules):
+                sub_leading, nullable = self._leading(sub_rule, backward)
+                leading |= sub_leading
+                if not nullable:
+                    return leading, False
+            return leading, True
+        elif isinstance(rule, Any):
+            leading = set()
+            nullable = False
+            for sub_rule in rule.rules:
+                sub_leading, sub_nullable = self._leading(sub_rule, backward)
+                leading |= sub_leading
+                nullable |= sub_nullable
+            return leading, nullable
+        elif isinstance(rule, (Repeat, Optional)):
+            return self._leading(rule.rule, backward)[0], True
+        else:
+            return self._leading(rule.rule, backward)
+
+    def find_recursive(self):
+        builders = self.engine.parser.builders
+
+        # nullable builders, computed up to a fixed point
+        size = -1
+        while size != len(self.nullable):
+            size = len(self.nullable)
+            for builder in builders:
+                if self._leading(builder.rule, False)[1]:
+                    self.nullable.add(id(builder))
+
+        for backward in (False, True):
+            graph = {id(builder): self._leading(builder.rule, backward)[0] for builder in builders}
+            for builder in builders:
+                seen = set()
+                todo = list(graph[id(builder)])
+                while todo:
+                    key = todo.pop()
+                    if key not in seen:
+                        seen.add(key)
+                        todo.extend(graph.get(key, ()))
+                if id(builder) in seen:
+                    self.recursive.add(id(builder))
+
+    def _bound(self, rule, backward: bool):
+        """The ids of the patterns a match of ``rule`` can start with (end with when ``backward``)"""
+        if isinstance(rule, Rule_Main):
+            return self.bounds[backward].get(id(rule), set())
+        elif isinstance(rule, Optimized_Match):
+            return set(rule.pattern_ids).union(*(self._bound(sub_rule, backward) for sub_rule in rule.rules))
+        elif isinstance(rule, Match):
+            bound = set(
+                self.patterns[id(pattern)].pattern_id
+                for pattern in self.engine.lexer.get_all_matching_patterns(rule.identifier)
+            )
+            for builder in self.engine.parser.get_all_matching_builders(rule.identifier):
+                bound |= self.bounds[backward].get(id(builder), set())
+            return bound
+        elif isinstance(rule, All):
+            bound = set()
+            for sub_rule in (reversed(rule.rules) if backward else rule.rules):
+                bound |= self._bound(sub_rule, backward)
+                if not self._leading(sub_rule, backward)[1]:
+                    break
+            return bound
+        elif isinstance(rule, Any):
+            return set().union(*(self._bound(sub_rule, backward) for sub_rule in rule.rules))
+        else:
+            return self._bound(rule.rule, backward)
+
+    def _expected(self, rule, backward: bool):
+        """
+            The identifiers of the matches without builder a match of the source ``rule`` can start with
+            (end with when ``backward``), they are the ones expected when ``rule`` fails at its first token
+        """
+        if isinstance(rule, Rule_Main):
+            return self.expects[backward].get(id(rule), set())
+        elif isinstance(rule, Match):
+            builders = self.engine.parser.get_all_matching_builders(rule.identifier)
+            if not builders:
+                return {rule.identifier}
+            return set().union(*(self.expects[backward].get(id(builder), set()) for builder in builders))
+        elif isinstance(rule, All):
+            expected = set()
+            for sub_rule in (reversed(rule.rules) if backward else rule.rules):
+                expected |= self._expected(sub_rule, backward)
+                if not self._leading(sub_rule, backward)[1]:
+                    break
+            return expected
+        elif isinstance(rule, Any):
+            return set().union(*(self._expected(sub_rule, backward) for sub_rule in rule.rules))
+        else:
+            return self._expected(rule.rule, backward)
+
+    def _fixed_point(self, function, tables: dict):
+        for backward, table in tables.items():
+            changed = True
+            while changed:
+                changed = False
+                for builder in self.engine.parser.builders:
+                    value = function(builder.rule, backward)
+                    if value != table.get(id(builder)):
+                        table[id(builder)] = value
+                        changed = True
+
+    def find_bounds(self):
+        self._fixed_point(self._bound, self.bounds)
+        self._fixed_point(self._expected, self.expects)
+
+    def guard(self, rule, backward: bool):
+        """The bound of the compiled ``rule``, None if it can match no token and then can't be skipped"""
+        if self._leading(rule, backward)[1]:
+            return None
+        return frozenset(self._bound(rule, backward))
+
+    def compile_parser(self):
+        self.find_recursive()
+        self.find_bounds()
+
+        # the builders are created first, so that recursive matches can refer to them
+        for builder in self.engine.parser.builders:
+            o_builder = self.builders[id(builder)] = builder.__class__(builder.identifier, None)
+            for bounds in self.bounds.values():
+                bounds[id(o_builder)] = bounds[id(builder)]
+            if id(builder) in self.nullable:
+                self.nullable.add(id(o_builder))
+
+        for builder in self.engine.parser.builders:
+            self.builders[id(builder)].rule = self.compile_rule(builder.rule)
+
+        parser = Parser(
+            *(self.builders[id(builder)] for builder in self.engine.parser.builders),
+            fast=self.engine.parser.fast,
+            iterative=self.engine.parser.iterative
+        )
+        if self.engine.parser.packrat:
+            parser.memo = Memo(self.engine.parser.memo.size)
+        return parser
+
+    def compile(self):
+        lexer = self.compile_lexer()
+        parser = self.compile_parser()
+        return Engine(lexer, parser, self.engine.astb)
+
+    def compile_rule(self, rule):
+        if isinstance(rule, Match):
+            return self.compile_match(rule)
+        elif isinstance(rule, All):
+            return self.flatten(All, rule.rules)
+        elif isinstance(rule, Any):
+            return self.flatten(Any, rule.rules)
+        elif isinstance(rule, As):
+            return As(rule.key, self.compile_rule(rule.rule))
+        elif isinstance(rule, In):
+            return In(rule.key, self.compile_rule(rule.rule))
+        elif isinstance(rule, Repeat):
+            return Repeat(self.compile_rule(rule.rule))
+        elif isinstance(rule, Optional):
+            return Optional(self.compile_rule(rule.rule))
+        else:
+            raise Exception(type(rule))
+
+    def flatten(self, cls, rules):
+        flat = []
+        for rule in map(self.compile_rule, rules):
+            if isinstance(rule, cls):
+                flat.extend(rule.rules)
+            else:
+                flat.append(rule)
+        return flat[0] if len(flat) == 1 else cls(*flat)
+
+    def compile_match(self, match: Match):
+        pattern_ids = set(
+            self.patterns[id(pattern)].pattern_id
+            for pattern in self.engine.lexer.get_all_matching_patterns(match.identifier)
+        )
+        rules = []
+
+        for builder in self.engine.parser.get_all_matching_builders(match.identifier):
+            if isinstance(builder, Routine) and id(builder) not in self.recursive and id(builder) not in self.inlining:
+                self.extend(pattern_ids, rules, self.inline(builder))
+            else:
+                rules.append(self.builders[id(builder)])
+
+        return Optimized_Match(
+            identifier=match.identifier,
+            pattern_ids=pattern_ids,
+            rules=rules,
+            firsts=[self.guard(rule, False) for rule in rules],
+            lasts=[self.guard(rule, True) for rule in rules],
+            expected_firsts=self._expected(match, False),
+            expected_lasts=self._expected(match, True)
+        )
+
+    def inline(self, routine: Routine):
+        """The compiled rule of ``routine``, a routine result is transparent when building the ast"""
+        if id(routine) not in self.inlined:
+            self.inlining.add(id(routine))
+            self.inlined[id(routine)] = self.compile_rule(routine.rule)
+            self.inlining.discard(id(routine))
+        return self.inlined[id(routine)]
+
+    def extend(self, pattern_ids: set, rules: list, rule):
+        """Add ``rule`` to the alternatives of a match, merging the alternatives of inlined Any and Matches"""
+        if isinstance(rule, Any):
+            for sub_rule in rule.rules:
+                self.extend(pattern_ids, rules, sub_rule)
+        elif isinstance(rule, Optimized_Match) and (not rules or not rule.pattern_ids):
+            # the patterns of an inlined match can only be tested first if no alternative comes before
+            pattern_ids.update(rule.pattern_ids)
+            rules.extend(rule.rules)
+        else:
+            rules.append(rule)
@@ -1,45 +1,61 @@
 from ...base import *
 from ...core import *
 from ...core.results import *
-from typing import List
+from typing import List, FrozenSet, Tuple
 
 
 class Optimized_Match(Match):
-    def __init__(self, identifier: str, patterns, builders):
+    """
+        Match resolved at compile time, ``pattern_ids`` are the ids of the matching patterns
+        and ``rules`` the builders to apply (or inlined routine bodies to parse) in order
+        a rule is only tried if the token at the position is in its ``firsts`` (``lasts`` when parsing backward)
+        or if they are None
+        ``expected_firsts`` (``expected_lasts``) are the identifiers the original match expects when no rule matches
+        at the position, as the rules skipped by their guard and the inlined matches don't note them
+    """
+    pattern_ids: FrozenSet[int]
+    rules: Tuple[Rule, ...]
+
+    def __init__(self, identifier: str, pattern_ids, rules, firsts=None, lasts=None, expected_firsts=None,
+                 expected_lasts=None):
         super().__init__(identifier)
-        self.patterns = patterns
-        self.builders = builders
+        self.pattern_ids = frozenset(pattern_ids)
+        self.rules = tuple(rules)
+        self.applied = tuple(isinstance(rule, Rule_Main) for rule in self.rules)
+        self.firsts = tuple(firsts) if firsts is not None else (None,) * len(self.rules)
+        self.lasts = tuple(lasts) if lasts is not None else (None,) * len(self.rules)
+        identifiers = frozenset() if self.rules else frozenset([identifier])
+        self.expected_firsts = frozenset(expected_firsts) if expected_firsts is not None else identifiers
+        self.expected_lasts = frozenset(expected_lasts) if expected_lasts is not None else identifiers
 
     def __str__(self):
-        return "Match(" + "|".join(pattern.identifier for pattern in (*self.patterns, *self.builders)) + ")"
+        return "Match(" + self.identifier + ")"
 
-    def parse(self, tokens: List[Token], position: int, parser: Parser, backward: bool = False):
+    def parse_steps(self, tokens: List[Token], position: int, parser: Parser, backward: bool = False):
         t_position = position - 1 if backward else position
-        if 0 <= t_position < len(tokens):
-            token = tokens[t_position]
-            if token.pattern in self.patterns:
-                result = MatchResult(rule=self, token=token)
+        token = self.get_token(tokens, t_position)
+        if token is None:
+            return self.missing(parser, position, backward)
+        if token.pattern_id in self.pattern_ids:
+            return MatchResult(rule=self, token=token)
+        return self.builder_steps(tokens, position, parser, backward, token)
+
+    def builder_steps(self, tokens: List[Token], position: int, parser: Parser, backward: bool, token: Token):
+        count = 0
+        result = None
+        for rule, applied, bound in zip(self.rules, self.applied, self.lasts if backward else self.firsts):
+            if bound is not None and token.pattern_id not in bound:
+                continue
+            if applied:
+                result = yield parser.apply_steps(rule, tokens, position, backward)
+            else:
+                result = yield rule.parse_steps(tokens, position, parser, backward)
+            if result:
                 return result
+            else:
+                count += 1
+
+        return self.mismatch(parser, token, position, backward, count, result)
 
-            count = 0
-            result = None
-            for builder in self.builders:
-                result = builder.generate_output(tokens, position, parser, backward)
-                if result:
-                    return result
-                else:
-                    count += 1
-
-            return Result_Error(
-                rule=self,
-                at_position=position,
-                reason=f"Token {repr(token.pattern.identifier)} doesn't match {repr(self.identifier)}"
-                       f", {count} routine or builder correponding to {repr(self.identifier)} (no match)",
-                result=result if count == 1 else None
-            )
-        else:
-            return Result_Error(
-                rule=self,
-                at_position=position,
-                reason="No token remaining"
-            )
+    def expect_mismatch(self, parser: Parser, t_position: int, backward: bool, count: int):
+        parser.expect_all(t_position, self.expected_lasts if backward else self.expected_firsts, backward)
@@ -3,6 +3,13 @@ from .Optimized_Token import Optimized_Token
 
 
 class Optimized_Pattern(Pattern):
+    pattern_id: int
+
+    def __init__(self, pattern_id: int, identifier: str, mode: str, expr: str,
+                 flag: int = 0, ignore: bool = False, value=None, priority: int = 0):
+        super().__init__(identifier, mode, expr, flag, ignore, value, priority)
+        self.pattern_id = pattern_id
+
     def make_token(self, content, at_index, at_position):
         if self.value is None:
             value = content
@@ -12,7 +19,7 @@ class Optimized_Pattern(Pattern):
             value = self.value
 
         return Optimized_Token(
-            pattern_id=id(self),
+            pattern=self,
             content=content,
             at_index=at_index,
             at_position=at_position,
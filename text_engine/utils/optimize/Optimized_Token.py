@@ -1,14 +1,10 @@
-from ...base import PositionedItem, LayeredItem, IndexedItem
+from ...core import Token
 
 
-class Optimized_Token(PositionedItem, LayeredItem, IndexedItem):
-    content: str
+class Optimized_Token(Token):
+    __slots__ = ("pattern_id",)
+    pattern_id: int
 
-    def __init__(self, pattern_id, content: str, at_index: int, at_position: int, value=None):
-        PositionedItem.__init__(self, at_position, at_position + 1)
-        IndexedItem.__init__(self, at_index, at_index + len(content))
-        LayeredItem.__init__(self, layer=0)
-
-        self.pattern_id = pattern_id
-        self.content = content
-        self.value = value
+    def __init__(self, pattern, content: str, at_index: int, at_position: int, value=None):
+        super().__init__(pattern, content, at_index, at_position, value)
+        self.pattern_id = pattern.pattern_id
@@ -1,54 +1,43 @@
 from ...core import *
+from ...base import Identified
 from .Optimized_Match import Optimized_Match
 from .Optimized_Pattern import Optimized_Pattern
+from .Optimized_Token import Optimized_Token
+from .Compiler import Compiler
 
 
-def _optimize_match(engine, match: Match):
-    patterns = tuple(engine.lexer.get_all_matching_patterns(match.identifier))
-    builders = tuple(engine.parser.get_all_matching_builders(match.identifier))
-    return Optimized_Match(identifier=match.identifier, patterns=patterns, builders=builders)
-
-
-def _optimize_rule(engine, rule):
-    if isinstance(rule, Match):
-        return _optimize_match(engine, rule)
-    elif isinstance(rule, All):
-        return All(*(_optimize_rule(engine, sub_rule) for sub_rule in rule.rules))
-    elif isinstance(rule, Any):
-        return Any(*(_optimize_rule(engine, sub_rule) for sub_rule in rule.rules))
-    elif isinstance(rule, As):
-        return As(rule.key, _optimize_rule(engine, rule.rule))
-    elif isinstance(rule, In):
-        return In(rule.key, _optimize_rule(engine, rule.rule))
-    elif isinstance(rule, Builder):
-        return Builder(rule.identifier, _optimize_rule(engine, rule.rule))
-    elif isinstance(rule, Routine):
-        return Routine(rule.identifier, _optimize_rule(engine, rule.rule))
-    elif isinstance(rule, Repeat):
-        return Repeat(_optimize_rule(engine, rule.rule))
-    elif isinstance(rule, Optional):
-        return Optional(_optimize_rule(engine, rule.rule))
-    else:
-        raise Exception(type(rule))
-
-
-def optimize(engine):
-    mapper = []
-    for pattern in sorted(engine.lexer.patterns, key=lambda pattern: pattern.priority):
-        o_pattern = Optimized_Pattern(
-            identifier=pattern.identifier,
-            mode=pattern.mode,
-            expr=pattern.expr,
-            flag=pattern.flag,
-            ignore=pattern.ignore,
-            value=pattern.value,
-            priority=pattern.priority
-        )
-
-        mapper.append((pattern, o_pattern))
-
-    parser = Parser(*(_optimize_rule(engine, builder) for builder in engine.parser.builders))
-
-    engine = Engine(engine.lexer, parser, engine.astb)
-
-    return engine
+class OptimizeError(Exception):
+    def __init__(self, text, expected, found):
+        self.text = text
+        self.expected = expected
+        self.found = found
+
+    def __str__(self):
+        return f"The optimized engine reads {self.text!r} as {self.found!r} instead of {self.expected!r}"
+
+
+def _read(engine: Engine, text: str, identifier: str, backward: bool):
+    """The raw ast read by ``engine``, or the name of the error raised"""
+    try:
+        return Engine(engine.lexer, engine.parser).read(text, identifier, backward=backward)
+    except Exception as e:
+        return e.__class__.__name__
+
+
+def check(engine: Engine, optimized: Engine, corpus, identifier: str = Identified.ALL, backward: bool = False):
+    """Raise an OptimizeError if ``optimized`` doesn't read the texts of ``corpus`` as ``engine`` does"""
+    for text in corpus:
+        expected = _read(engine, text, identifier, backward)
+        found = _read(optimized, text, identifier, backward)
+        if expected != found:
+            raise OptimizeError(text, expected, found)
+
+
+def optimize(engine: Engine, corpus=(), identifier: str = Identified.ALL, backward: bool = False):
+    """
+        Compile the grammar of ``engine`` into an equivalent and faster Engine (see Compiler)
+        the compiled engine is checked to read every text of ``corpus`` as the original one
+    """
+    optimized = Compiler(engine).compile()
+    check(engine, optimized, corpus, identifier, backward)
+    return optimized